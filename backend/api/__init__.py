@@ -1,5 +1,5 @@
 """API gateway package that exposes the end-to-end RAG HTTP interface."""
 
-from .gateway import PipelineState, RAGAPIServer, RAGGatewayHandler
+from .gateway import PipelineState, QueryBatcher, RAGAPIServer, RAGGatewayHandler
 
-__all__ = ["PipelineState", "RAGAPIServer", "RAGGatewayHandler"]
+__all__ = ["PipelineState", "QueryBatcher", "RAGAPIServer", "RAGGatewayHandler"]
@@ -9,27 +9,151 @@ requirements limited to the Python standard library.
 
 from __future__ import annotations
 
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+from itertools import repeat
 import json
 import logging
+import multiprocessing
+import os
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import queue
 import threading
-from typing import Dict, Iterable, List, Optional, Sequence
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+from backend.async_http import AsyncHTTPServer, Response
 from backend.generation.fusion import ContextFusion, ContextSnippet
 from backend.generation.response import GeneratedResponse, ResponseGenerator
 from backend.ingestion.chunking import TextChunk, chunk_text
 from backend.ingestion.deduplication import DeduplicatedResult, deduplicate_chunks
-from backend.retrieval.embeddings import LocalEmbeddingModel
-from backend.retrieval.index import HNSWIndex, IVFIndex, IndexedVector, VectorIndex
+from backend.json_codec import json_dumps, json_loads
+from backend.retrieval.embeddings import LocalEmbeddingModel, Vector
+from backend.retrieval.index import HNSWIndex, IVFIndex, IVFPQIndex, IndexedVector, VectorIndex
 
 LOGGER = logging.getLogger(__name__)
 
+EMBEDDING_CACHE_SIZE = 10_000
+QUERY_TIMEOUT_S = 30.0
+
 
 def _stringify_metadata(metadata: Dict[str, object]) -> Dict[str, str]:
-    """Convert metadata values to strings so they remain JSON serialisable."""
+    """Convert metadata values to strings so they remain JSON serialisable.
+
+    Metadata that already holds only strings is returned as-is rather than
+    copied, so callers must not mutate the result.
+    """
+
+    if all(type(value) is str for value in metadata.values()):
+        return metadata  # type: ignore[return-value]
+    _str = str
+    return {key: _str(value) for key, value in metadata.items()}
+
+
+def _prepare_chunks(
+    document: Dict[str, object],
+    *,
+    document_id: int,
+    chunk_size: int,
+    overlap: int,
+) -> Sequence[TextChunk]:
+    content = document.get("content", "")
+    if not isinstance(content, str) or not content.strip():
+        raise ValueError("Document content must be a non-empty string")
+    metadata = document.get("metadata", {})
+    if not isinstance(metadata, dict):
+        raise ValueError("Document metadata must be a dictionary")
+    label = str(document.get("name", metadata.get("source", f"document-{document_id}")))
+    # Stringified once per document; chunk_text only adds string offsets,
+    # so ``_embed_chunks`` does not need to convert values again.
+    chunk_metadata = {"document_id": str(document_id), "source": label}
+    chunk_metadata.update(_stringify_metadata(metadata))
+    return chunk_text(content, chunk_size=chunk_size, overlap=overlap, metadata=chunk_metadata)
+
+
+def _chunk_and_deduplicate(
+    document: Dict[str, object],
+    document_id: int,
+    chunk_size: int,
+    overlap: int,
+) -> DeduplicatedResult:
+    chunks = _prepare_chunks(document, document_id=document_id, chunk_size=chunk_size, overlap=overlap)
+    return deduplicate_chunks(chunks)
+
+
+@lru_cache(maxsize=None)
+def _worker_model(dimension: int) -> LocalEmbeddingModel:
+    return LocalEmbeddingModel(dimension=dimension)
+
+
+def _prepare_document(
+    document: Dict[str, object],
+    document_id: int,
+    chunk_size: int,
+    overlap: int,
+    dimension: int,
+) -> Tuple[DeduplicatedResult, List[Vector]]:
+    """Chunk, deduplicate and embed one document; runs in ingestion worker processes.
+
+    Embedding is the expensive part of ingestion, so it happens here rather
+    than in the parent.  Bucket hashing is stable across processes, so the
+    vectors match the ones the parent computes for queries.
+    """
+
+    dedup_result = _chunk_and_deduplicate(document, document_id, chunk_size, overlap)
+    vectors = _worker_model(dimension).embed_many(chunk.text for chunk in dedup_result.unique_chunks)
+    return dedup_result, vectors
+
+
+class _ReadWriteLock:
+    """Lock that lets readers share access while writers get it exclusively.
+
+    Waiting writers block new readers so a steady stream of queries cannot
+    starve ``configure``/``ingest``.  The lock is not re-entrant.
+    """
 
-    return {key: str(value) for key, value in metadata.items()}
+    def __init__(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._condition:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
 
 
 class PipelineState:
@@ -41,19 +165,38 @@ class PipelineState:
         self.generator = ResponseGenerator()
         self.chunk_size = 400
         self.overlap = 40
-        self._lock = threading.RLock()
+        # ``configure``/``ingest`` mutate the index and take the write side;
+        # queries only read it and may run concurrently.
+        self._lock = _ReadWriteLock()
         self._ingested_documents: List[Dict[str, str]] = []
         self._chunk_counter = 0
+        # Content digest -> embedding, so text repeated across documents
+        # (licences, headers, boilerplate) is only embedded once.
+        self._embed_cache: OrderedDict[bytes, Vector] = OrderedDict()
+        self.embedding_cache_size = EMBEDDING_CACHE_SIZE
+        self.ingest_workers = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
 
     def _initialise_index(self, index_type: str, dimension: int, params: Dict[str, object]) -> VectorIndex:
         index_type = index_type.lower()
+        quantization = str(params.get("quantization", "none")).lower()
         if index_type == "hnsw":
             ef = int(params.get("ef", 32))
-            return HNSWIndex(dimension, ef=ef)
+            return HNSWIndex(dimension, ef=ef, quantization=quantization)
         if index_type == "ivf":
             n_lists = int(params.get("n_lists", 4))
             iterations = int(params.get("iterations", 5))
-            return IVFIndex(dimension, n_lists=n_lists, iterations=iterations)
+            return IVFIndex(dimension, n_lists=n_lists, iterations=iterations, quantization=quantization)
+        if index_type == "ivfpq":
+            if quantization != "none":
+                raise ValueError("ivfpq indexes compress vectors themselves and do not support quantization")
+            return IVFPQIndex(
+                dimension,
+                n_lists=int(params.get("n_lists", 4)),
+                m_subquantizers=int(params.get("m", 16)),
+                n_bits=int(params.get("nbits", 8)),
+                iterations=int(params.get("iterations", 5)),
+            )
         raise ValueError(f"Unsupported index type: {index_type}")
 
     def configure(
@@ -65,11 +208,31 @@ class PipelineState:
         overlap: int = 40,
         generator_max_tokens: int | None = None,
         index_params: Optional[Dict[str, object]] = None,
+        ingest_workers: int = 0,
+        embedding_cache_size: Optional[int] = None,
     ) -> Dict[str, object]:
-        """Configure the pipeline and reset previously ingested state."""
+        """Configure the pipeline and reset previously ingested state.
+
+        ``ingest_workers`` greater than zero chunks, deduplicates and embeds
+        the documents of an ingest request in that many worker processes.  It
+        is capped at the number of CPUs.
+
+        ``embedding_cache_size`` bounds the cache of full-precision chunk
+        embeddings (``0`` disables it).  By default it is disabled for
+        quantized and IVF-PQ indexes, whose point is to avoid holding those
+        vectors in memory, and ``EMBEDDING_CACHE_SIZE`` otherwise.
+        """
 
         params = index_params or {}
-        with self._lock:
+        max_workers = os.cpu_count() or 1
+        if not 0 <= ingest_workers <= max_workers:
+            raise ValueError(f"ingest_workers must be between 0 and {max_workers}")
+        if embedding_cache_size is None:
+            compressed = index_type.lower() == "ivfpq" or str(params.get("quantization", "none")).lower() != "none"
+            embedding_cache_size = 0 if compressed else EMBEDDING_CACHE_SIZE
+        if embedding_cache_size < 0:
+            raise ValueError("embedding_cache_size must be non-negative")
+        with self._lock.write():
             LOGGER.debug(
                 "Configuring pipeline",
                 extra={
@@ -90,6 +253,17 @@ class PipelineState:
             self.overlap = overlap
             self._ingested_documents.clear()
             self._chunk_counter = 0
+            self._embed_cache.clear()
+            self.embedding_cache_size = embedding_cache_size
+            if ingest_workers != self.ingest_workers:
+                self._shutdown_executor()
+                self.ingest_workers = ingest_workers
+                if ingest_workers:
+                    # Spawned rather than forked: this process already runs the
+                    # server, batcher and ``to_thread`` worker threads.
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=ingest_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
         return {
             "status": "configured",
             "index": index_type,
@@ -98,54 +272,87 @@ class PipelineState:
             "overlap": overlap,
             "index_params": params,
             "generator_max_tokens": generator_max_tokens,
+            "ingest_workers": ingest_workers,
+            "embedding_cache_size": embedding_cache_size,
         }
 
-    def _prepare_chunks(
-        self,
-        document: Dict[str, object],
-        *,
-        document_id: int,
-    ) -> Sequence[TextChunk]:
-        content = document.get("content", "")
-        if not isinstance(content, str) or not content.strip():
-            raise ValueError("Document content must be a non-empty string")
-        metadata = document.get("metadata", {})
-        if not isinstance(metadata, dict):
-            raise ValueError("Document metadata must be a dictionary")
-        label = str(document.get("name", metadata.get("source", f"document-{document_id}")))
-        chunk_metadata = {"document_id": str(document_id), "source": label}
-        chunk_metadata.update(_stringify_metadata(metadata))
-        chunks = chunk_text(
-            content,
-            chunk_size=self.chunk_size,
-            overlap=self.overlap,
-            metadata=chunk_metadata,
+    def _shutdown_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def close(self) -> None:
+        """Release the ingestion worker processes, if any."""
+
+        with self._lock.write():
+            self._shutdown_executor()
+            self.ingest_workers = 0
+
+    def _embed_texts(self, texts: Sequence[str]) -> List[Vector]:
+        """Embed ``texts``, reusing cached vectors for previously seen content."""
+
+        if not self.embedding_cache_size:
+            return self.embedding_model.embed_many(texts)
+        cache = self._embed_cache
+        keys = [hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest() for text in texts]
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key in cache:
+                cache.move_to_end(key)
+            else:
+                missing.setdefault(key, text)
+        cache.update(zip(missing, self.embedding_model.embed_many(missing.values())))
+        vectors = [cache[key] for key in keys]
+        while len(cache) > self.embedding_cache_size:
+            cache.popitem(last=False)
+        LOGGER.debug(
+            "Embedding cache lookup",
+            extra={"texts": len(texts), "misses": len(missing), "cached": len(cache)},
         )
-        return chunks
+        return vectors
 
-    def _embed_chunks(self, chunks: Sequence[TextChunk]) -> List[IndexedVector]:
+    def _embed_chunks(
+        self, chunks: Sequence[TextChunk], embeddings: Optional[Sequence[Vector]] = None
+    ) -> List[IndexedVector]:
+        if embeddings is None:
+            embeddings = self._embed_texts([chunk.text for chunk in chunks])
         vectors: List[IndexedVector] = []
-        for chunk in chunks:
-            metadata = dict(chunk.metadata)
-            metadata.setdefault("chunk_id", str(self._chunk_counter))
-            metadata.setdefault("text", chunk.text)
-            metadata = _stringify_metadata(metadata)
-            vector = self.embedding_model.embed(chunk.text)
+        for chunk, vector in zip(chunks, embeddings):
+            # Chunk metadata wins over the defaults, matching ``setdefault``.
+            metadata = {"chunk_id": str(self._chunk_counter), "text": chunk.text, **chunk.metadata}
             vectors.append(IndexedVector(vector=vector, metadata=metadata))
             self._chunk_counter += 1
         return vectors
 
     def ingest(self, documents: Sequence[Dict[str, object]]) -> Dict[str, object]:
-        with self._lock:
+        with self._lock.write():
             if self.index is None:
                 raise RuntimeError("Pipeline has not been configured")
             summaries: List[Dict[str, object]] = []
             total_chunks = 0
             duplicates_summary: Dict[str, List[str]] = {}
-            for doc_index, document in enumerate(documents, start=1):
-                chunks = self._prepare_chunks(document, document_id=len(self._ingested_documents) + doc_index)
-                dedup_result: DeduplicatedResult = deduplicate_chunks(chunks)
-                indexed_vectors = self._embed_chunks(dedup_result.unique_chunks)
+            first_id = len(self._ingested_documents) + 1
+            document_ids = range(first_id, first_id + len(documents))
+            prepared: Iterable[Tuple[DeduplicatedResult, Optional[List[Vector]]]]
+            if self._executor is not None and len(documents) > 1:
+                # Workers chunk, deduplicate and embed; index updates stay in
+                # this process so the index keeps a single writer.  Their
+                # vectors bypass the embedding cache.
+                prepared = self._executor.map(
+                    _prepare_document,
+                    documents,
+                    document_ids,
+                    repeat(self.chunk_size),
+                    repeat(self.overlap),
+                    repeat(self.embedding_model.dimension),
+                )
+            else:
+                prepared = (
+                    (_chunk_and_deduplicate(document, document_id, self.chunk_size, self.overlap), None)
+                    for document, document_id in zip(documents, document_ids)
+                )
+            for document, (dedup_result, embeddings) in zip(documents, prepared):
+                indexed_vectors = self._embed_chunks(dedup_result.unique_chunks, embeddings)
                 if isinstance(self.index, IVFIndex) and not getattr(self.index, "_centroids", []):
                     # ``fit`` expects the raw vectors.
                     raw_vectors = [item.vector for item in indexed_vectors]
@@ -185,72 +392,307 @@ class PipelineState:
             text = metadata.get("text", "")
             if not text:
                 continue
-            snippet_metadata = dict(metadata)
-            snippet_metadata.setdefault("source", metadata.get("source_path", metadata.get("source", "unknown")))
-            snippets.append(ContextSnippet(content=text, metadata=snippet_metadata, score=score))
+            # The index's metadata dict is shared read-only; it is only copied
+            # when a "source" key has to be added for the response.
+            if "source" not in metadata:
+                metadata = {**metadata, "source": metadata.get("source_path", "unknown")}
+            snippets.append(ContextSnippet(content=text, metadata=metadata, score=score, source=metadata["source"]))
         return snippets
 
+    def _answer(self, question: str, results: Iterable[tuple[float, Dict[str, str]]]) -> Dict[str, object]:
+        snippets = self._build_snippets(results)
+        generated: GeneratedResponse = self.generator.generate(question, snippets)
+        LOGGER.debug("Generated response", extra={"citations": len(generated.citations)})
+        return {
+            "status": "answered",
+            "answer": generated.answer,
+            "citations": [
+                {"text": citation.text, "source": citation.source, "score": citation.score}
+                for citation in generated.citations
+            ],
+            "snippets": [
+                {
+                    "content": snippet.content,
+                    "score": snippet.score,
+                    "metadata": snippet.metadata,
+                }
+                for snippet in snippets
+            ],
+        }
+
     def query(self, question: str, *, k: int = 5, retrieval_params: Optional[Dict[str, object]] = None) -> Dict[str, object]:
-        with self._lock:
+        return self.query_batch([question], k=k, retrieval_params=retrieval_params)[0]
+
+    def query_batch(
+        self,
+        questions: Sequence[str],
+        *,
+        k: int = 5,
+        retrieval_params: Optional[Dict[str, object]] = None,
+    ) -> List[Dict[str, object]]:
+        """Answer several questions that share ``k`` and ``retrieval_params``.
+
+        The questions are embedded and searched as one batch under the read
+        side of the pipeline lock, so concurrent batches do not serialise.
+        """
+
+        with self._lock.read():
             if self.index is None:
                 raise RuntimeError("Pipeline has not been configured")
-            if not question.strip():
+            if any(not question.strip() for question in questions):
                 raise ValueError("Question must be a non-empty string")
             retrieval_params = retrieval_params or {}
-            vector = self.embedding_model.embed(question)
-            results = self.index.search(vector, k=k, **retrieval_params)
-            snippets = self._build_snippets(results)
-            generated: GeneratedResponse = self.generator.generate(question, snippets)
-            LOGGER.debug("Generated response", extra={"citations": len(generated.citations)})
-            return {
-                "status": "answered",
-                "answer": generated.answer,
-                "citations": [
-                    {"text": citation.text, "source": citation.source, "score": citation.score}
-                    for citation in generated.citations
-                ],
-                "snippets": [
-                    {
-                        "content": snippet.content,
-                        "score": snippet.score,
-                        "metadata": snippet.metadata,
-                    }
-                    for snippet in snippets
-                ],
-            }
+            vectors = self.embedding_model.embed_many(questions)
+            batch_results = self.index.search_batch(vectors, k=k, **retrieval_params)
+            return [
+                self._answer(question, results)
+                for question, results in zip(questions, batch_results)
+            ]
+
+
+@dataclass
+class _PendingQuery:
+    question: str
+    k: int
+    retrieval_params: Dict[str, object]
+    future: Future[Dict[str, object]]
+
+
+class QueryBatcher:
+    """Coalesce concurrent ``/query`` requests into batched pipeline calls.
+
+    Requests are queued by the HTTP handler threads and drained by a single
+    worker thread.  The worker waits at most ``max_wait_ms`` after the first
+    request for more to arrive, up to ``max_batch_size`` per batch, then
+    answers requests sharing ``k`` and retrieval parameters together.
+
+    Groups within a batch are answered one after another on the worker, so
+    batched queries do not overlap each other; the shared read lock only lets
+    them run alongside unbatched readers.  ``stop`` fails any request still
+    queued with :class:`RuntimeError` and further ``submit`` calls are
+    rejected.
+    """
+
+    def __init__(
+        self,
+        state: PipelineState,
+        *,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 2.0,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be non-negative")
+        self.state = state
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._logger = logger or LOGGER
+        self._queue: queue.Queue[_PendingQuery | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._state_lock = threading.Lock()
+        self._stopping = False
+
+    def start(self) -> None:
+        with self._state_lock:
+            if self._thread:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="QueryBatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._state_lock:
+            thread = self._thread
+            if not thread or self._stopping:
+                return
+            self._stopping = True
+            self._queue.put(None)
+        thread.join()
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is not None and pending.future.set_running_or_notify_cancel():
+                pending.future.set_exception(RuntimeError("Query batcher stopped"))
+        with self._state_lock:
+            self._thread = None
+
+    def submit(
+        self,
+        question: str,
+        *,
+        k: int = 5,
+        retrieval_params: Optional[Dict[str, object]] = None,
+    ) -> Future[Dict[str, object]]:
+        """Queue ``question`` and return a future resolving to its response."""
+
+        future: Future[Dict[str, object]] = Future()
+        with self._state_lock:
+            if not self._thread:
+                raise RuntimeError("Query batcher has not been started")
+            if self._stopping:
+                raise RuntimeError("Query batcher is stopping")
+            self._queue.put(_PendingQuery(question, k, retrieval_params or {}, future))
+        return future
+
+    def _collect(self, first: _PendingQuery) -> tuple[List[_PendingQuery], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stopping = self._collect(first)
+            groups: Dict[tuple[int, str], List[_PendingQuery]] = {}
+            for pending in batch:
+                if not pending.future.set_running_or_notify_cancel():
+                    # The caller timed out and cancelled the request.
+                    continue
+                key = (pending.k, repr(sorted(pending.retrieval_params.items())))
+                groups.setdefault(key, []).append(pending)
+            for group in groups.values():
+                self._answer_group(group)
+            self._logger.debug("Answered query batch", extra={"size": len(batch), "groups": len(groups)})
+            if stopping:
+                return
+
+    def _answer_group(self, group: List[_PendingQuery]) -> None:
+        head = group[0]
+        try:
+            responses = self.state.query_batch(
+                [pending.question for pending in group],
+                k=head.k,
+                retrieval_params=head.retrieval_params,
+            )
+        except Exception as exc:  # noqa: BLE001 - failures are reported through the futures
+            if len(group) == 1:
+                head.future.set_exception(exc)
+                return
+            # Retry individually so one bad request does not fail its neighbours.
+            for pending in group:
+                self._answer_group([pending])
+            return
+        for pending, response in zip(group, responses):
+            pending.future.set_result(response)
+
+
+_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Allow-Methods": "OPTIONS, POST",
+}
 
 
 def _json_response(handler: BaseHTTPRequestHandler, payload: Dict[str, object], *, status: int = HTTPStatus.OK) -> None:
-    body = json.dumps(payload).encode("utf-8")
+    body = json_dumps(payload)
     handler.send_response(status)
     handler.send_header("Content-Type", "application/json")
     handler.send_header("Content-Length", str(len(body)))
-    handler.send_header("Access-Control-Allow-Origin", "*")
-    handler.send_header("Access-Control-Allow-Headers", "Content-Type")
-    handler.send_header("Access-Control-Allow-Methods", "OPTIONS, POST")
+    for name, value in _CORS_HEADERS.items():
+        handler.send_header(name, value)
     handler.end_headers()
     handler.wfile.write(body)
 
 
+def _parse_payload(data: bytes) -> Dict[str, object]:
+    try:
+        return json_loads(data or b"{}")  # type: ignore[return-value]
+    except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
+        raise ValueError("Invalid JSON payload")
+
+
+def _error_response(exc: Exception) -> tuple[int, Dict[str, object]]:
+    if isinstance(exc, TimeoutError):
+        return HTTPStatus.GATEWAY_TIMEOUT, {"error": "Query timed out"}
+    if isinstance(exc, RuntimeError):
+        return HTTPStatus.CONFLICT, {"error": str(exc)}
+    return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+
+
+def _query_arguments(payload: Dict[str, object]) -> tuple[str, int, Dict[str, object]]:
+    question = str(payload.get("question", ""))
+    top_k = int(payload.get("k", 5))
+    retrieval_params = payload.get("retrieval", {})
+    if retrieval_params and not isinstance(retrieval_params, dict):
+        raise ValueError("retrieval parameters must be a dictionary")
+    return question, top_k, retrieval_params or {}  # type: ignore[return-value]
+
+
+def _dispatch(
+    state: PipelineState,
+    path: str,
+    payload: Dict[str, object],
+    batcher: Optional[QueryBatcher] = None,
+) -> tuple[int, Dict[str, object]]:
+    """Route a POST request to the pipeline and return ``(status, body)``."""
+
+    try:
+        if path == "/setup":
+            response = state.configure(
+                index_type=str(payload.get("index", "hnsw")),
+                dimension=int(payload.get("dimension", 256)),
+                chunk_size=int(payload.get("chunk_size", 400)),
+                overlap=int(payload.get("overlap", 40)),
+                generator_max_tokens=(
+                    int(payload["generator_max_tokens"]) if payload.get("generator_max_tokens") else None
+                ),
+                index_params=payload.get("index_params"),
+                ingest_workers=int(payload.get("ingest_workers", 0)),
+                embedding_cache_size=(
+                    int(payload["embedding_cache_size"]) if payload.get("embedding_cache_size") is not None else None
+                ),
+            )
+            return HTTPStatus.OK, response
+        if path == "/ingest":
+            documents = payload.get("documents", [])
+            if not isinstance(documents, list):
+                raise ValueError("documents must be a list")
+            return HTTPStatus.CREATED, state.ingest(documents)
+        if path == "/query":
+            question, top_k, retrieval_params = _query_arguments(payload)
+            if batcher is not None:
+                future = batcher.submit(question, k=top_k, retrieval_params=retrieval_params)
+                try:
+                    return HTTPStatus.OK, future.result(timeout=QUERY_TIMEOUT_S)
+                except TimeoutError:
+                    future.cancel()
+                    raise
+            return HTTPStatus.OK, state.query(question, k=top_k, retrieval_params=retrieval_params)
+    except (ValueError, RuntimeError, TimeoutError) as exc:
+        return _error_response(exc)
+    return HTTPStatus.NOT_FOUND, {"error": "Not found"}
+
+
 class RAGGatewayHandler(BaseHTTPRequestHandler):
     """HTTP handler that exposes the pipeline state via JSON endpoints."""
 
     state: PipelineState = PipelineState()
+    batcher: Optional[QueryBatcher] = None
 
     def do_OPTIONS(self) -> None:  # noqa: N802 - required signature
         self.send_response(HTTPStatus.NO_CONTENT)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.send_header("Access-Control-Allow-Methods", "OPTIONS, POST")
+        for name, value in _CORS_HEADERS.items():
+            self.send_header(name, value)
         self.end_headers()
 
     def _parse_body(self) -> Dict[str, object]:
         length = int(self.headers.get("Content-Length", "0"))
-        data = self.rfile.read(length) if length else b"{}"
-        try:
-            return json.loads(data)
-        except json.JSONDecodeError:
-            raise ValueError("Invalid JSON payload")
+        return _parse_payload(self.rfile.read(length) if length else b"{}")
 
     def do_POST(self) -> None:  # noqa: N802 - required signature
         try:
@@ -258,84 +700,113 @@ class RAGGatewayHandler(BaseHTTPRequestHandler):
         except ValueError as exc:
             _json_response(self, {"error": str(exc)}, status=HTTPStatus.BAD_REQUEST)
             return
-
-        try:
-            if self.path == "/setup":
-                response = self.state.configure(
-                    index_type=str(payload.get("index", "hnsw")),
-                    dimension=int(payload.get("dimension", 256)),
-                    chunk_size=int(payload.get("chunk_size", 400)),
-                    overlap=int(payload.get("overlap", 40)),
-                    generator_max_tokens=(
-                        int(payload["generator_max_tokens"]) if payload.get("generator_max_tokens") else None
-                    ),
-                    index_params=payload.get("index_params"),
-                )
-                _json_response(self, response)
-                return
-            if self.path == "/ingest":
-                documents = payload.get("documents", [])
-                if not isinstance(documents, list):
-                    raise ValueError("documents must be a list")
-                response = self.state.ingest(documents)
-                _json_response(self, response, status=HTTPStatus.CREATED)
-                return
-            if self.path == "/query":
-                question = str(payload.get("question", ""))
-                top_k = int(payload.get("k", 5))
-                retrieval_params = payload.get("retrieval", {})
-                if retrieval_params and not isinstance(retrieval_params, dict):
-                    raise ValueError("retrieval parameters must be a dictionary")
-                response = self.state.query(question, k=top_k, retrieval_params=retrieval_params)
-                _json_response(self, response)
-                return
-        except ValueError as exc:
-            _json_response(self, {"error": str(exc)}, status=HTTPStatus.BAD_REQUEST)
-            return
-        except RuntimeError as exc:
-            _json_response(self, {"error": str(exc)}, status=HTTPStatus.CONFLICT)
-            return
-
-        _json_response(self, {"error": "Not found"}, status=HTTPStatus.NOT_FOUND)
+        status, response = _dispatch(self.state, self.path, payload, self.batcher)
+        _json_response(self, response, status=status)
 
     def log_message(self, format: str, *args: object) -> None:  # noqa: A003 - upstream signature
         LOGGER.info("HTTP %s - %s", format, args)
 
 
 class RAGAPIServer:
-    """Convenience wrapper that manages the HTTP server lifecycle."""
+    """Convenience wrapper that manages the HTTP server lifecycle.
 
-    def __init__(self, host: str = "127.0.0.1", port: int = 8000, state: PipelineState | None = None) -> None:
+    By default requests are served by an asyncio event loop: ``/query``
+    requests await the :class:`QueryBatcher` future and ``/setup`` and
+    ``/ingest`` run in worker threads, so slow ingestion never stops the
+    server from accepting connections.  ``server="threading"`` keeps the
+    previous thread-per-connection ``ThreadingHTTPServer``.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        state: PipelineState | None = None,
+        *,
+        server: str = "asyncio",
+        batch_queries: bool = True,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 2.0,
+    ) -> None:
+        if server not in ("asyncio", "threading"):
+            raise ValueError(f"Unsupported server type: {server}")
         self.host = host
         self.port = port
         self.state = state or PipelineState()
-        self._server: ThreadingHTTPServer | None = None
+        self.server = server
+        self.batcher = (
+            QueryBatcher(self.state, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+            if batch_queries
+            else None
+        )
+        self._server: ThreadingHTTPServer | AsyncHTTPServer | None = None
         self._thread: threading.Thread | None = None
 
+    async def _handle(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Response:
+        if method == "OPTIONS":
+            return HTTPStatus.NO_CONTENT, dict(_CORS_HEADERS), b""
+        if method != "POST":
+            status, response = HTTPStatus.NOT_IMPLEMENTED, {"error": f"Unsupported method ({method})"}
+        else:
+            try:
+                payload = _parse_payload(body)
+            except ValueError as exc:
+                status, response = HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+            else:
+                status, response = await self._route(path, payload)
+        headers = {"Content-Type": "application/json", **_CORS_HEADERS}
+        return status, headers, json_dumps(response)
+
+    async def _route(self, path: str, payload: Dict[str, object]) -> tuple[int, Dict[str, object]]:
+        if path == "/query" and self.batcher is not None:
+            try:
+                question, top_k, retrieval_params = _query_arguments(payload)
+                future = self.batcher.submit(question, k=top_k, retrieval_params=retrieval_params)
+                # Timing out cancels the wrapped future, so the batcher skips it.
+                return HTTPStatus.OK, await asyncio.wait_for(asyncio.wrap_future(future), QUERY_TIMEOUT_S)
+            except (ValueError, RuntimeError, TimeoutError) as exc:
+                return _error_response(exc)
+        return await asyncio.to_thread(_dispatch, self.state, path, payload)
+
     def start(self) -> None:
         if self._server:
             return
-        handler = type(
-            "ConfiguredRAGGatewayHandler",
-            (RAGGatewayHandler,),
-            {"state": self.state},
-        )
-        self._server = ThreadingHTTPServer((self.host, self.port), handler)
-        self.port = self._server.server_address[1]
-        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
-        self._thread.start()
-        LOGGER.info("Started RAG API server", extra={"host": self.host, "port": self.port})
+        if self.batcher:
+            self.batcher.start()
+        if self.server == "asyncio":
+            async_server = AsyncHTTPServer(self._handle, self.host, self.port, logger=LOGGER)
+            async_server.start()
+            self.port = async_server.port
+            self._server = async_server
+        else:
+            handler = type(
+                "ConfiguredRAGGatewayHandler",
+                (RAGGatewayHandler,),
+                {"state": self.state, "batcher": self.batcher},
+            )
+            threaded_server = ThreadingHTTPServer((self.host, self.port), handler)
+            self.port = threaded_server.server_address[1]
+            self._thread = threading.Thread(target=threaded_server.serve_forever, daemon=True)
+            self._thread.start()
+            self._server = threaded_server
+        LOGGER.info("Started RAG API server", extra={"host": self.host, "port": self.port, "server": self.server})
 
     def stop(self) -> None:
         if not self._server:
             return
-        self._server.shutdown()
-        if self._thread:
-            self._thread.join(timeout=1)
-        self._server.server_close()
+        if isinstance(self._server, AsyncHTTPServer):
+            self._server.stop()
+        else:
+            self._server.shutdown()
+            if self._thread:
+                self._thread.join(timeout=1)
+            self._server.server_close()
+        if self.batcher:
+            self.batcher.stop()
+        self.state.close()
         self._server = None
         self._thread = None
         LOGGER.info("Stopped RAG API server")
 
 
-__all__ = ["PipelineState", "RAGAPIServer", "RAGGatewayHandler"]
+__all__ = ["PipelineState", "QueryBatcher", "RAGAPIServer", "RAGGatewayHandler"]
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from backend.api import gateway
+from backend.api.gateway import PipelineState, QueryBatcher, RAGAPIServer, _dispatch, _ReadWriteLock
+from backend.json_codec import json_dumps, json_loads
+from backend.retrieval.index import IVFPQIndex
+
+
+def _configured_state() -> PipelineState:
+    state = PipelineState()
+    state.configure(index_type="hnsw", dimension=32, chunk_size=40, overlap=5)
+    state.ingest(
+        [
+            {"name": "animals", "content": "the quick brown fox jumps over the lazy dog"},
+            {"name": "rag", "content": "retrieval augmented generation grounds answers in documents"},
+        ]
+    )
+    return state
+
+
+def test_query_batch_answers_each_question() -> None:
+    state = _configured_state()
+    responses = state.query_batch(["quick brown fox", "retrieval augmented generation"], k=1)
+    assert len(responses) == 2
+    assert responses[0]["citations"][0]["source"] == "animals"
+    assert responses[1]["citations"][0]["source"] == "rag"
+
+
+def test_query_batcher_resolves_concurrent_requests() -> None:
+    state = _configured_state()
+    batcher = QueryBatcher(state, max_batch_size=8, max_wait_ms=20)
+    batcher.start()
+    try:
+        questions = ["quick brown fox", "retrieval augmented generation"] * 4
+        with ThreadPoolExecutor(max_workers=len(questions)) as pool:
+            futures = list(pool.map(lambda question: batcher.submit(question, k=1), questions))
+        responses = [future.result(timeout=5) for future in futures]
+        assert [response["citations"][0]["source"] for response in responses] == ["animals", "rag"] * 4
+        with pytest.raises(ValueError):
+            batcher.submit("   ", k=1).result(timeout=5)
+    finally:
+        batcher.stop()
+
+
+def test_query_batcher_times_out_and_rejects_requests_after_stop(monkeypatch: pytest.MonkeyPatch) -> None:
+    state = _configured_state()
+    release = threading.Event()
+    query_batch = state.query_batch
+
+    def blocking_query_batch(questions, **kwargs):  # type: ignore[no-untyped-def]
+        release.wait(timeout=5)
+        return query_batch(questions, **kwargs)
+
+    monkeypatch.setattr(state, "query_batch", blocking_query_batch)
+    monkeypatch.setattr(gateway, "QUERY_TIMEOUT_S", 0.05)
+    batcher = QueryBatcher(state, max_batch_size=1, max_wait_ms=0)
+    batcher.start()
+    try:
+        running = batcher.submit("quick brown fox", k=1)
+        status, body = _dispatch(state, "/query", {"question": "retrieval", "k": 1}, batcher)
+        assert status == 504
+    finally:
+        release.set()
+        batcher.stop()
+    assert running.result(timeout=5)["citations"][0]["source"] == "animals"
+    with pytest.raises(RuntimeError):
+        batcher.submit("quick brown fox", k=1)
+
+
+def test_read_write_lock_shares_reads_and_excludes_writes() -> None:
+    lock = _ReadWriteLock()
+    both_reading = threading.Barrier(2, timeout=5)
+    concurrent_reads: list[bool] = []
+    written = threading.Event()
+
+    def reader() -> None:
+        with lock.read():
+            both_reading.wait()
+            concurrent_reads.append(True)
+
+    def writer() -> None:
+        with lock.write():
+            written.set()
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    for thread in readers:
+        thread.start()
+    for thread in readers:
+        thread.join(timeout=5)
+    assert concurrent_reads == [True, True]
+
+    with lock.read():
+        pending_writer = threading.Thread(target=writer)
+        pending_writer.start()
+        pending_writer.join(timeout=0.05)
+        assert not written.is_set()
+    pending_writer.join(timeout=5)
+    assert written.is_set()
+
+
+def test_ingest_reuses_embeddings_for_repeated_content() -> None:
+    state = PipelineState()
+    state.configure(index_type="hnsw", dimension=32, chunk_size=40, overlap=5)
+    embedded: list[str] = []
+    embed_many = state.embedding_model.embed_many
+
+    def counting_embed_many(texts):  # type: ignore[no-untyped-def]
+        texts = list(texts)
+        embedded.extend(texts)
+        return embed_many(texts)
+
+    state.embedding_model.embed_many = counting_embed_many  # type: ignore[method-assign]
+    boilerplate = "this notice is shared by every contract in the archive"
+    state.ingest([{"name": "a", "content": boilerplate}])
+    first_pass = len(embedded)
+    response = state.ingest([{"name": "b", "content": boilerplate}])
+    assert response["chunks"] == first_pass
+    assert len(embedded) == first_pass
+
+
+def test_embedding_cache_is_disabled_for_compressed_indexes() -> None:
+    state = PipelineState()
+    assert state.configure(index_type="hnsw", dimension=32)["embedding_cache_size"] > 0
+    response = state.configure(index_type="hnsw", dimension=32, index_params={"quantization": "int8"})
+    assert response["embedding_cache_size"] == 0
+    state.ingest([{"name": "a", "content": "quantized vectors should not be cached at full precision"}])
+    assert not state._embed_cache
+    assert state.configure(index_type="ivfpq", dimension=32)["embedding_cache_size"] == 0
+    assert state.configure(index_type="hnsw", dimension=32, embedding_cache_size=2)["embedding_cache_size"] == 2
+
+
+def test_setup_configures_an_ivfpq_index() -> None:
+    state = PipelineState()
+    status, body = _dispatch(
+        state,
+        "/setup",
+        {
+            "index": "ivfpq",
+            "dimension": 32,
+            "chunk_size": 40,
+            "overlap": 5,
+            "index_params": {"n_lists": 2, "m": 4, "nbits": 2},
+        },
+    )
+    assert status == 200
+    assert body["index"] == "ivfpq"
+    assert isinstance(state.index, IVFPQIndex)
+    content = (
+        "product quantization compresses stored vectors. "
+        "the quick brown fox jumps over the lazy dog. "
+        "retrieval augmented generation grounds answers in documents."
+    )
+    documents = [{"name": "notes", "content": content}]
+    assert _dispatch(state, "/ingest", {"documents": documents})[0] == 201
+    status, body = _dispatch(state, "/query", {"question": "compressed vectors", "k": 1})
+    assert status == 200
+    assert body["citations"][0]["source"] == "notes"
+    status, body = _dispatch(
+        state, "/setup", {"index": "ivfpq", "dimension": 32, "index_params": {"quantization": "int8"}}
+    )
+    assert status == 400
+
+
+def test_json_codec_encodes_integers_wider_than_64_bits() -> None:
+    payload = {"chunk_size": 2**70, "question": "caf\u00e9"}
+    assert json_loads(json_dumps(payload)) == payload
+
+
+def _post(base_url: str, path: str, payload: dict) -> tuple[int, dict]:
+    request = urllib.request.Request(
+        f"{base_url}{path}",
+        data=json.dumps(payload).encode("utf-8"),
+        method="POST",
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+@pytest.mark.parametrize("server", ["asyncio", "threading"])
+def test_gateway_server_round_trip(server: str) -> None:
+    api = RAGAPIServer(port=0, server=server)
+    api.start()
+    try:
+        base_url = f"http://{api.host}:{api.port}"
+        assert _post(base_url, "/setup", {"index": "hnsw", "dimension": 32})[0] == 200
+        documents = [{"name": "notes", "content": "local rag systems keep documents private"}]
+        assert _post(base_url, "/ingest", {"documents": documents})[0] == 201
+        status, body = _post(base_url, "/query", {"question": "private rag", "k": 1})
+        assert status == 200
+        assert body["citations"][0]["source"] == "notes"
+        assert _post(base_url, "/query", {"question": ""})[0] == 400
+        assert _post(base_url, "/unknown", {})[0] == 404
+    finally:
+        api.stop()
+
+
+def test_parallel_ingest_matches_serial_ingest() -> None:
+    documents = [
+        {"name": f"doc-{index}", "content": f"Document {index} covers topic {index}. " * 20}
+        for index in range(4)
+    ]
+    serial = PipelineState()
+    serial.configure(index_type="hnsw", dimension=64, chunk_size=120, overlap=20)
+    parallel = PipelineState()
+    workers = min(2, os.cpu_count() or 1)
+    parallel.configure(index_type="hnsw", dimension=64, chunk_size=120, overlap=20, ingest_workers=workers)
+    try:
+        assert parallel.ingest(documents) == serial.ingest(documents)
+        question = "Which document covers topic 2?"
+        assert parallel.query(question, k=3) == serial.query(question, k=3)
+    finally:
+        parallel.close()
+
+
+def test_ingest_workers_are_capped_at_cpu_count() -> None:
+    state = PipelineState()
+    with pytest.raises(ValueError):
+        state.configure(ingest_workers=(os.cpu_count() or 1) + 1)
+    with pytest.raises(ValueError):
+        state.configure(ingest_workers=-1)
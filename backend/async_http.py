@@ -0,0 +1,183 @@
+"""Minimal asyncio HTTP/1.1 server for the local JSON APIs.
+
+Only the subset of HTTP the frontend and tests rely on is implemented:
+request line, headers, ``Content-Length`` bodies, and keep-alive
+connections.  Requests are handed to an ``async`` callback so slow work can
+be awaited (for example a batched query future, or ``asyncio.to_thread`` for
+ingestion) while the event loop keeps accepting connections.  The loop runs
+on a background thread so callers get the same ``start``/``stop`` lifecycle
+as the ``ThreadingHTTPServer`` based servers, and everything stays within
+the Python standard library.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from http import HTTPStatus
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+Response = Tuple[int, Dict[str, str], bytes]
+RequestHandler = Callable[[str, str, Dict[str, str], bytes], Awaitable[Response]]
+
+
+class AsyncHTTPServer:
+    """Serve ``handler`` on an asyncio event loop running in a daemon thread.
+
+    ``handler`` receives ``(method, path, headers, body)`` with lower-cased
+    header names and returns ``(status, headers, body)``.  ``Content-Length``
+    and ``Connection`` response headers are added automatically.
+    """
+
+    def __init__(
+        self,
+        handler: RequestHandler,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        max_body_size: int = 64 * 1024 * 1024,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.max_body_size = max_body_size
+        self._handler = handler
+        self._logger = logger or LOGGER
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connections: Dict[asyncio.Task[None], asyncio.StreamWriter] = {}
+
+    def start(self) -> None:
+        if self._thread:
+            return
+        ready = threading.Event()
+        failure: list[BaseException] = []
+        self._thread = threading.Thread(
+            target=self._run, args=(ready, failure), name="AsyncHTTPServer", daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+        if failure:
+            self._thread.join()
+            self._thread = None
+            raise failure[0]
+        self._logger.debug("Started asyncio HTTP server", extra={"host": self.host, "port": self.port})
+
+    def stop(self) -> None:
+        if not self._thread:
+            return
+        if self._loop and self._stopping:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join(timeout=1)
+        self._thread = None
+        self._loop = None
+        self._stopping = None
+        self._logger.debug("Stopped asyncio HTTP server")
+
+    def _run(self, ready: threading.Event, failure: list[BaseException]) -> None:
+        try:
+            asyncio.run(self._main(ready))
+        except BaseException as exc:  # noqa: BLE001 - surfaced to ``start``
+            failure.append(exc)
+        finally:
+            ready.set()
+
+    async def _main(self, ready: threading.Event) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        server = await asyncio.start_server(self._accept, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        ready.set()
+        async with server:
+            await self._stopping.wait()
+            server.close()
+            # Closing the transports wakes idle keep-alive connections with EOF;
+            # requests still in flight get a moment to finish writing.
+            for writer in self._connections.values():
+                writer.close()
+            if self._connections:
+                await asyncio.wait(list(self._connections), timeout=1)
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections[task] = writer
+        try:
+            await self._serve(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while True:
+            try:
+                request_line = await reader.readline()
+            except ValueError:  # line longer than the stream limit
+                await self._write(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, {}, b"", keep_alive=False)
+                return
+            if not request_line.strip():
+                return
+            parts = request_line.decode("latin-1").split()
+            if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+                await self._write(writer, HTTPStatus.BAD_REQUEST, {}, b"", keep_alive=False)
+                return
+            method, path, version = parts
+            headers: Dict[str, str] = {}
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await self._write(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, {}, b"", keep_alive=False)
+                    return
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if "transfer-encoding" in headers:
+                await self._write(writer, HTTPStatus.NOT_IMPLEMENTED, {}, b"", keep_alive=False)
+                return
+            try:
+                length = int(headers.get("content-length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0 or length > self.max_body_size:
+                await self._write(writer, HTTPStatus.BAD_REQUEST, {}, b"", keep_alive=False)
+                return
+            body = await reader.readexactly(length) if length else b""
+            connection = headers.get("connection", "").lower()
+            keep_alive = version == "HTTP/1.1" and connection != "close"
+            try:
+                status, response_headers, payload = await self._handler(method, path, headers, body)
+            except Exception:  # noqa: BLE001 - a failing request must not kill the connection loop
+                self._logger.exception("Unhandled error while serving %s %s", method, path)
+                status, response_headers, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {}, b""
+            await self._write(writer, status, response_headers, payload, keep_alive=keep_alive)
+            self._logger.info("HTTP %s %s - %s", method, path, int(status))
+            if not keep_alive:
+                return
+
+    @staticmethod
+    async def _write(
+        writer: asyncio.StreamWriter,
+        status: int,
+        headers: Dict[str, str],
+        body: bytes,
+        *,
+        keep_alive: bool,
+    ) -> None:
+        status = HTTPStatus(status)
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        lines.append(f"Content-Length: {len(body)}")
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+
+__all__ = ["AsyncHTTPServer", "RequestHandler", "Response"]
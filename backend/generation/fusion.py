@@ -3,19 +3,29 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import heapq
 import logging
-from typing import List, Sequence
+from typing import List, Optional, Sequence
 
 LOGGER = logging.getLogger(__name__)
 
 
 @dataclass
 class ContextSnippet:
-    """Small unit of retrieved context."""
+    """Small unit of retrieved context.
+
+    ``source`` defaults to ``metadata["source"]`` (or ``"unknown"``) when
+    not given; an explicitly passed source, even an empty one, is kept.
+    """
 
     content: str
     metadata: dict[str, str]
     score: float
+    source: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.source is None:
+            self.source = self.metadata.get("source", "unknown")
 
 
 class ContextFusion:
@@ -35,23 +45,33 @@ class ContextFusion:
     def fuse(self, snippets: Sequence[ContextSnippet]) -> List[ContextSnippet]:
         """Return a curated list of snippets that respects ``max_tokens``."""
 
-        ordered = sorted(snippets, key=lambda snippet: snippet.score, reverse=True)
+        # Snippets are popped best-first from a heap, so only as many as the
+        # budget needs get ordered.  Snippets that do not fit are skipped and
+        # lower-ranked ones may still fit, so the candidates are not cut
+        # short up front.  The position breaks score ties in input order, as
+        # a stable descending sort would.
+        heap = [(-snippet.score, position, snippet) for position, snippet in enumerate(snippets)]
+        heapq.heapify(heap)
         budget = self.max_tokens
         fused: List[ContextSnippet] = []
-        for snippet in ordered:
+        debug = self._logger.isEnabledFor(logging.DEBUG)
+        while heap:
+            _, _, snippet = heapq.heappop(heap)
             cost = self._token_estimate(snippet.content)
             if cost > budget:
-                self._logger.debug(
-                    "Skipping snippet - exceeds budget",
-                    extra={"snippet_score": snippet.score, "cost": cost, "budget": budget},
-                )
+                if debug:
+                    self._logger.debug(
+                        "Skipping snippet - exceeds budget",
+                        extra={"snippet_score": snippet.score, "cost": cost, "budget": budget},
+                    )
                 continue
             fused.append(snippet)
             budget -= cost
-            self._logger.debug(
-                "Selected snippet",
-                extra={"remaining_budget": budget, "score": snippet.score},
-            )
+            if debug:
+                self._logger.debug(
+                    "Selected snippet",
+                    extra={"remaining_budget": budget, "score": snippet.score},
+                )
             if budget <= 0:
                 break
         return fused
@@ -10,6 +10,8 @@ from .fusion import ContextSnippet, ContextFusion
 
 LOGGER = logging.getLogger(__name__)
 
+_ANSWER_SUFFIX = "Answer: Based on the retrieved information, the question can be addressed using the cited snippets above."
+
 
 @dataclass
 class Citation:
@@ -36,17 +38,14 @@ class ResponseGenerator:
         self._logger = logger or LOGGER
 
     def _build_answer(self, question: str, snippets: Iterable[ContextSnippet]) -> str:
-        parts = [f"Question: {question}"]
-        for index, snippet in enumerate(snippets, start=1):
-            parts.append(f"Snippet {index}: {snippet.content}")
-        parts.append("Answer: Based on the retrieved information, the question can be addressed using the cited snippets above.")
-        return "\n".join(parts)
+        snippet_lines = [f"Snippet {index}: {snippet.content}" for index, snippet in enumerate(snippets, start=1)]
+        return "\n".join(("Question: " + question, *snippet_lines, _ANSWER_SUFFIX))
 
     def _build_citations(self, snippets: Iterable[ContextSnippet]) -> List[Citation]:
         citations = [
             Citation(
                 text=snippet.content,
-                source=snippet.metadata.get("source", "unknown"),
+                source=snippet.source,
                 score=snippet.score,
             )
             for snippet in snippets
@@ -15,6 +15,17 @@ def test_context_fusion_respects_token_budget() -> None:
     assert fused[0].metadata["source"] == "a"
 
 
+def test_context_fusion_keeps_looking_after_oversized_snippets() -> None:
+    snippets = [
+        ContextSnippet(content="one two three four five six", metadata={"source": "a"}, score=0.9),
+        ContextSnippet(content="one two three four five six seven", metadata={"source": "b"}, score=0.8),
+        ContextSnippet(content="one two three four five six seven eight", metadata={"source": "c"}, score=0.7),
+        ContextSnippet(content="short", metadata={"source": "d"}, score=0.1),
+    ]
+    fused = ContextFusion(max_tokens=3).fuse(snippets)
+    assert [snippet.source for snippet in fused] == ["d"]
+
+
 def test_response_generator_produces_citations() -> None:
     snippets = [
         ContextSnippet(content="answer part", metadata={"source": "doc1"}, score=0.7),
@@ -25,3 +36,9 @@ def test_response_generator_produces_citations() -> None:
     assert "Question: What is RAG?" in response.answer
     assert response.citations[0].source == "doc1"
     assert len(response.citations) <= len(snippets)
+
+
+def test_context_snippet_source_defaults_to_metadata() -> None:
+    assert ContextSnippet(content="text", metadata={"source": "a"}, score=0.5).source == "a"
+    assert ContextSnippet(content="text", metadata={}, score=0.5).source == "unknown"
+    assert ContextSnippet(content="text", metadata={"source": "a"}, score=0.5, source="").source == ""
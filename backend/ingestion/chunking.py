@@ -10,7 +10,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 import logging
-from typing import Dict, Iterator, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
 LOGGER = logging.getLogger(__name__)
@@ -25,6 +25,30 @@ class TextChunk:
     metadata: Dict[str, str] = field(default_factory=dict)
 
 
+def _chunk_offsets(text_length: int, chunk_size: int, overlap: int) -> Tuple[range, List[int]]:
+    """Return the ``(starts, ends)`` offsets of every window.
+
+    Window starts advance by ``chunk_size - overlap`` and the last window is
+    the first one that reaches the end of the text.  Only that final window
+    can be shorter than ``chunk_size``, so the offsets are built from ranges
+    without any per-window arithmetic in Python.
+    """
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if overlap < 0:
+        raise ValueError("overlap must be non-negative")
+    if overlap >= chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+    if not text_length:
+        return range(0), []
+    step = chunk_size - overlap
+    last_start = max(0, -(-(text_length - chunk_size) // step)) * step
+    starts = range(0, last_start + 1, step)
+    ends = [*range(chunk_size, last_start + chunk_size, step), text_length]
+    return starts, ends
+
+
 def chunk_text(
     text: str,
     *,
@@ -50,36 +74,18 @@ def chunk_text(
         level logger.
     """
 
-    if chunk_size <= 0:
-        raise ValueError("chunk_size must be positive")
-    if overlap < 0:
-        raise ValueError("overlap must be non-negative")
-    if overlap >= chunk_size:
-        raise ValueError("overlap must be smaller than chunk_size")
-
+    text_length = len(text)
+    starts, ends = _chunk_offsets(text_length, chunk_size, overlap)
     active_logger = logger or LOGGER
     meta = metadata or {}
-    chunks: List[TextChunk] = []
-    start = 0
-    index = 0
-    text_length = len(text)
     active_logger.debug(
         "Starting chunking", extra={"chunk_size": chunk_size, "overlap": overlap, "length": text_length}
     )
-    while start < text_length:
-        end = min(start + chunk_size, text_length)
-        chunk_text_value = text[start:end]
-        chunk_metadata = dict(meta)
-        chunk_metadata.update({"start": str(start), "end": str(end)})
-        chunks.append(TextChunk(id=index, text=chunk_text_value, metadata=chunk_metadata))
-        active_logger.debug(
-            "Created chunk",
-            extra={"chunk_id": index, "start": start, "end": end, "length": len(chunk_text_value)},
-        )
-        if end == text_length:
-            break
-        start = end - overlap
-        index += 1
+    chunks = [
+        TextChunk(id=index, text=text[start:end], metadata={**meta, "start": str(start), "end": str(end)})
+        for index, (start, end) in enumerate(zip(starts, ends))
+    ]
+    active_logger.debug("Created chunks", extra={"count": len(chunks), "length": text_length})
     return chunks
 
 
@@ -93,18 +99,18 @@ def stream_chunks(
 ) -> Iterator[TextChunk]:
     """Yield chunks one-by-one.
 
-    This is a thin wrapper around :func:`chunk_text` that yields the
-    resulting chunks lazily.
+    Produces the same chunks as :func:`chunk_text`, but each chunk is only
+    sliced out of ``text`` when it is requested, so very long documents are
+    never materialised as a full list of chunks.
     """
 
-    for chunk in chunk_text(
-        text,
-        chunk_size=chunk_size,
-        overlap=overlap,
-        metadata=metadata,
-        logger=logger,
-    ):
-        yield chunk
+    starts, ends = _chunk_offsets(len(text), chunk_size, overlap)
+    meta = metadata or {}
+    (logger or LOGGER).debug(
+        "Streaming chunks", extra={"chunk_size": chunk_size, "overlap": overlap, "length": len(text)}
+    )
+    for index, (start, end) in enumerate(zip(starts, ends)):
+        yield TextChunk(id=index, text=text[start:end], metadata={**meta, "start": str(start), "end": str(end)})
 
 
 __all__ = ["TextChunk", "chunk_text", "stream_chunks"]
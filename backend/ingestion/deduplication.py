@@ -17,14 +17,19 @@ class DeduplicatedResult:
     """Result of a deduplication pass."""
 
     unique_chunks: List[TextChunk]
-    duplicates: Dict[str, List[str]]  # hash -> list of chunk ids
+    duplicates: Dict[str, List[str]]  # hex fingerprint -> list of chunk ids
 
 
-def _hash_text(text: str, *, salt: str = "") -> str:
-    digest = hashlib.sha256()
-    digest.update(salt.encode("utf-8"))
-    digest.update(text.encode("utf-8"))
-    return digest.hexdigest()
+def _hash_text(text: str, *, salt: str = "") -> int:
+    # A 128-bit BLAKE2b digest keeps accidental collisions out of reach even
+    # across large corpora.  Held as an integer, it hashes cheaply for the
+    # ``seen`` lookups.
+    digest = hashlib.blake2b((salt + text).encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _to_hex(fingerprint: int) -> str:
+    return f"{fingerprint:032x}"
 
 
 def deduplicate_chunks(
@@ -40,25 +45,32 @@ def deduplicate_chunks(
     """
 
     active_logger = logger or LOGGER
-    seen: Dict[str, TextChunk] = {}
-    duplicates: Dict[str, List[str]] = {}
+    # Checked once so the per-chunk ``extra`` dicts are only built when used.
+    debug = active_logger.isEnabledFor(logging.DEBUG)
+    seen: Dict[int, TextChunk] = {}
+    duplicates: Dict[int, List[str]] = {}
     ordered: List[TextChunk] = []
     for chunk in chunks:
         fingerprint = _hash_text(chunk.text.strip(), salt=salt)
-        active_logger.debug(
-            "Evaluating chunk for deduplication",
-            extra={"chunk_id": chunk.id, "fingerprint": fingerprint[:8]},
-        )
-        if fingerprint in seen:
-            duplicates.setdefault(fingerprint, []).append(str(chunk.id))
+        if debug:
             active_logger.debug(
-                "Detected duplicate chunk",
-                extra={"original_id": seen[fingerprint].id, "duplicate_id": chunk.id},
+                "Evaluating chunk for deduplication",
+                extra={"chunk_id": chunk.id, "fingerprint": _to_hex(fingerprint)[:8]},
             )
+        if fingerprint in seen:
+            duplicates.setdefault(fingerprint, []).append(str(chunk.id))
+            if debug:
+                active_logger.debug(
+                    "Detected duplicate chunk",
+                    extra={"original_id": seen[fingerprint].id, "duplicate_id": chunk.id},
+                )
             continue
         seen[fingerprint] = chunk
         ordered.append(chunk)
-    return DeduplicatedResult(unique_chunks=ordered, duplicates=duplicates)
+    return DeduplicatedResult(
+        unique_chunks=ordered,
+        duplicates={_to_hex(fingerprint): ids for fingerprint, ids in duplicates.items()},
+    )
 
 
 __all__ = ["DeduplicatedResult", "deduplicate_chunks"]
@@ -22,11 +22,13 @@ content without any third-party packages.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+import hashlib
 import io
 import logging
+import mmap
 import os
 import re
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from xml.etree import ElementTree
 from zipfile import ZipFile
 
@@ -50,11 +52,20 @@ class Document:
         Raw bytes from the input file.  This is useful for auditing and
         for enabling downstream hashing/deduplication logic without
         reopening the file from disk.
+    fingerprint:
+        Hex BLAKE2b digest of ``content``, computed once when the document
+        is created so duplicate documents can be found with a set lookup
+        instead of comparing their text.
     """
 
     content: str
     metadata: Dict[str, str] = field(default_factory=dict)
     raw_bytes: bytes = b""
+    fingerprint: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.fingerprint:
+            self.fingerprint = hashlib.blake2b(self.content.encode("utf-8"), digest_size=16).hexdigest()
 
 
 class BaseParser:
@@ -63,23 +74,38 @@ class BaseParser:
     def __init__(self, logger: Optional[logging.Logger] = None) -> None:
         self._logger = logger or LOGGER
 
-    def parse(self, file_path: str) -> Document:
+    def parse(self, file_path: str, *, keep_raw_bytes: bool = True) -> Document:
         """Parse ``file_path`` and return a :class:`Document` instance.
 
         Sub-classes implement :meth:`_parse_bytes` to extract structured
         content.  The base implementation takes care of reading the file
         and enriching the metadata with the source path.
+
+        The file is memory-mapped rather than read, so parsing does not need
+        a private copy of it.  ``keep_raw_bytes=False`` leaves
+        :attr:`Document.raw_bytes` empty and avoids copying the file into
+        memory at all.
         """
 
         self._logger.debug("Parsing file", extra={"file_path": file_path})
         with open(file_path, "rb") as handle:
-            data = handle.read()
-        content = self._parse_bytes(data)
+            try:
+                data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Empty files cannot be mapped, and neither can pipes or some
+                # network and virtual filesystems; read those instead.
+                data = handle.read()
+                content = self._parse_bytes(data)
+                raw_bytes = data if keep_raw_bytes else b""
+            else:
+                with data:
+                    content = self._parse_bytes(data)  # type: ignore[arg-type]
+                    raw_bytes = data[:] if keep_raw_bytes else b""
         metadata = {"source_path": os.path.abspath(file_path)}
         self._logger.debug(
             "Finished parsing file", extra={"file_path": file_path, "length": len(content)}
         )
-        return Document(content=content, metadata=metadata, raw_bytes=data)
+        return Document(content=content, metadata=metadata, raw_bytes=raw_bytes)
 
     # pylint: disable=unused-argument
     def _parse_bytes(self, data: bytes) -> str:
@@ -98,20 +124,22 @@ class PDFParser(BaseParser):
     documents.
     """
 
-    _TEXT_PATTERN = re.compile(r"\((?:\\.|[^\\)])*\)")
+    # Matched against the raw bytes, so the file is never decoded as a whole;
+    # only the literal operands are decoded.  The body is written as an
+    # "unrolled loop": runs of ordinary bytes are consumed by one character
+    # class and the alternation is only entered at a backslash, instead of
+    # trying ``\\.|[^\\)]`` for every byte.  The group captures the operand
+    # without its parentheses so ``findall`` hands back exactly the bytes to
+    # decode, with no match objects or re-slicing.
+    _TEXT_PATTERN = re.compile(rb"\(([^\\)]*(?:\\.[^\\)]*)*)\)")
 
     def _parse_bytes(self, data: bytes) -> str:  # type: ignore[override]
         self._logger.debug("Extracting text from PDF bytes", extra={"size": len(data)})
-        try:
-            text = data.decode("latin-1")
-        except UnicodeDecodeError as exc:  # pragma: no cover - highly unlikely
-            raise ValueError("Unable to decode PDF bytes") from exc
-
         pieces: Iterable[str] = (
-            match.group(0)[1:-1].encode("latin-1").decode("unicode_escape")
-            for match in self._TEXT_PATTERN.finditer(text)
+            operand.decode("unicode_escape").strip()
+            for operand in self._TEXT_PATTERN.findall(data)
         )
-        result = "\n".join(piece.strip() for piece in pieces if piece.strip())
+        result = "\n".join(piece for piece in pieces if piece)
         self._logger.debug(
             "Extracted text from PDF", extra={"line_count": len(result.splitlines())}
         )
@@ -125,19 +153,31 @@ class WordParser(BaseParser):
 
     def _parse_bytes(self, data: bytes) -> str:  # type: ignore[override]
         self._logger.debug("Extracting text from DOCX bytes", extra={"size": len(data)})
+        paragraph_tag = f"{self._XML_NAMESPACE}p"
+        text_tag = f"{self._XML_NAMESPACE}t"
+        # One slot per paragraph in document order, filled in when it closes.
+        paragraphs: List[str] = []
+        # Text runs of every open paragraph.  A run counts towards each
+        # enclosing paragraph (as with nested text boxes) and runs outside
+        # any paragraph are ignored.
+        open_paragraphs: List[Tuple[int, List[str]]] = []
         with ZipFile(io.BytesIO(data)) as archive:
             with archive.open("word/document.xml") as document_xml:
-                tree = ElementTree.parse(document_xml)
-        root = tree.getroot()
-        paragraphs = []
-        for paragraph in root.iter(f"{self._XML_NAMESPACE}p"):
-            texts = [
-                node.text
-                for node in paragraph.iter(f"{self._XML_NAMESPACE}t")
-                if node.text
-            ]
-            if texts:
-                paragraphs.append("".join(texts))
+                # Stream the XML rather than building the full tree; each
+                # paragraph is cleared as soon as its text has been emitted.
+                for event, element in ElementTree.iterparse(document_xml, events=("start", "end")):
+                    if element.tag == paragraph_tag:
+                        if event == "start":
+                            open_paragraphs.append((len(paragraphs), []))
+                            paragraphs.append("")
+                        else:
+                            slot, texts = open_paragraphs.pop()
+                            paragraphs[slot] = "".join(texts)
+                            element.clear()
+                    elif event == "end" and element.tag == text_tag and element.text:
+                        for _, texts in open_paragraphs:
+                            texts.append(element.text)
+        paragraphs = [paragraph for paragraph in paragraphs if paragraph]
         result = "\n".join(paragraphs)
         self._logger.debug(
             "Extracted text from DOCX", extra={"paragraphs": len(paragraphs)}
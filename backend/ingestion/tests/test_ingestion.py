@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import hashlib
+import mmap
 import tempfile
 from pathlib import Path
 from zipfile import ZipFile
 from xml.etree import ElementTree
 
+import pytest
+
 from backend.ingestion.chunking import chunk_text
 from backend.ingestion.deduplication import deduplicate_chunks
-from backend.ingestion.parsers import PDFParser, WordParser
+from backend.ingestion.parsers import Document, PDFParser, WordParser
 
 
 def _create_fake_pdf(path: Path, text: str) -> None:
@@ -41,6 +45,43 @@ def test_pdf_parser_extracts_text(tmp_path: Path) -> None:
     assert document.metadata["source_path"].endswith("sample.pdf")
 
 
+def test_parser_raw_bytes_are_optional(tmp_path: Path) -> None:
+    file_path = tmp_path / "sample.pdf"
+    _create_fake_pdf(file_path, "Mapped PDF")
+    parser = PDFParser()
+    assert parser.parse(str(file_path)).raw_bytes == file_path.read_bytes()
+    document = parser.parse(str(file_path), keep_raw_bytes=False)
+    assert document.content == "Mapped PDF"
+    assert document.raw_bytes == b""
+    empty_path = tmp_path / "empty.pdf"
+    empty_path.write_bytes(b"")
+    assert parser.parse(str(empty_path)).content == ""
+
+
+def test_parser_reads_files_that_cannot_be_mapped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    file_path = tmp_path / "sample.pdf"
+    _create_fake_pdf(file_path, "Unmapped PDF")
+
+    def refuse_mapping(*args: object, **kwargs: object) -> mmap.mmap:
+        raise OSError("mmap is not supported on this filesystem")
+
+    monkeypatch.setattr(mmap, "mmap", refuse_mapping)
+    document = PDFParser().parse(str(file_path))
+    assert document.content == "Unmapped PDF"
+    assert document.raw_bytes == file_path.read_bytes()
+
+
+def test_documents_with_equal_content_share_a_fingerprint(tmp_path: Path) -> None:
+    first, second = tmp_path / "first.pdf", tmp_path / "second.pdf"
+    _create_fake_pdf(first, "Same text")
+    _create_fake_pdf(second, "Same text")
+    parser = PDFParser()
+    fingerprint = parser.parse(str(first)).fingerprint
+    assert len(fingerprint) == 32
+    assert parser.parse(str(second)).fingerprint == fingerprint
+    assert Document(content="Other text").fingerprint != fingerprint
+
+
 def test_word_parser_extracts_text(tmp_path: Path) -> None:
     file_path = tmp_path / "sample.docx"
     _create_docx(file_path, ["First paragraph", "Second paragraph"])
@@ -50,6 +91,27 @@ def test_word_parser_extracts_text(tmp_path: Path) -> None:
     assert "Second paragraph" in document.content
 
 
+def test_word_parser_handles_nested_paragraphs_and_stray_runs(tmp_path: Path) -> None:
+    namespace = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    xml = (
+        f'<w:document xmlns:w="{namespace}"><w:body>'
+        "<w:p><w:r><w:t>Before</w:t></w:r></w:p>"
+        "<w:p><w:r><w:t>Outer </w:t><w:pict><w:txbxContent>"
+        "<w:p><w:r><w:t>Inner</w:t></w:r></w:p>"
+        "</w:txbxContent></w:pict></w:r></w:p>"
+        "<w:t>Stray</w:t>"
+        "<w:p><w:r><w:t>After</w:t></w:r></w:p>"
+        "</w:body></w:document>"
+    )
+    file_path = tmp_path / "textbox.docx"
+    with ZipFile(file_path, "w") as archive:
+        archive.writestr("word/document.xml", xml)
+    document = WordParser().parse(str(file_path))
+    # A text box paragraph also counts towards its enclosing paragraph, and
+    # runs outside any paragraph are dropped, exactly as with a full parse.
+    assert document.content == "Before\nOuter Inner\nInner\nAfter"
+
+
 def test_chunking_and_deduplication_workflow() -> None:
     text = "Lorem ipsum dolor sit amet consectetur adipiscing elit."
     chunks = chunk_text(text, chunk_size=20, overlap=5)
@@ -58,3 +120,6 @@ def test_chunking_and_deduplication_workflow() -> None:
     result = deduplicate_chunks(duplicated)
     assert len(result.unique_chunks) == len(chunks)
     assert result.duplicates  # Duplicates should be tracked
+    # Keys are 128-bit fingerprints of the stripped chunk text.
+    expected = hashlib.blake2b(chunks[0].text.strip().encode("utf-8"), digest_size=16).hexdigest()
+    assert expected in result.duplicates
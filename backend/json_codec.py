@@ -0,0 +1,32 @@
+"""JSON encoding shared by the local HTTP APIs.
+
+``orjson`` is used when it happens to be installed and the standard ``json``
+module otherwise, so the runtime requirements stay limited to the standard
+library.  Decoding errors from either backend are ``json.JSONDecodeError``
+instances (``orjson.JSONDecodeError`` subclasses it).
+"""
+
+from __future__ import annotations
+
+import json
+
+try:  # Optional accelerator, never required.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def json_loads(data: bytes) -> object:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(payload: object) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits echoed back from a request.
+            pass
+    return json.dumps(payload).encode("utf-8")
@@ -2,40 +2,80 @@
 
 from __future__ import annotations
 
+import asyncio
+from functools import lru_cache
 import json
 import logging
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import threading
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
+from backend.async_http import AsyncHTTPServer, Response
+from backend.json_codec import json_dumps, json_loads
+
 from .embeddings import LocalEmbeddingModel, Vector
 from .index import HNSWIndex, IVFIndex, IndexedVector
 
 LOGGER = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=8)
+def _make_model(dimension: int) -> LocalEmbeddingModel:
+    # Models keep no per-call state, so one instance per dimension can be
+    # shared by every handler thread and reused across reconfigurations.
+    return LocalEmbeddingModel(dimension=dimension)
+
+
+@lru_cache(maxsize=4096)
+def _embed_cached(dimension: int, text: str) -> Vector:
+    # Embeddings are a pure function of ``(dimension, text)``, so repeated
+    # queries and re-posted documents skip the n-gram pipeline.  Callers must
+    # treat the returned vector as read-only since it is shared.
+    return _make_model(dimension).embed(text)
+
+
 class RetrievalState:
     """Mutable state shared between HTTP handlers."""
 
     def __init__(self) -> None:
-        self.embedding_model = LocalEmbeddingModel()
+        self.embedding_model = _make_model(256)
         self.index: Optional[HNSWIndex | IVFIndex] = None
         self._lock = threading.Lock()
+        # ``(kind, dimension, quantization)`` of the current index, published only after the
+        # index is in place so ``ensure_index`` can skip the lock when it matches.
+        self._config: Optional[Tuple[str, int, str]] = None
 
-    def ensure_index(self, kind: str, dimension: int) -> None:
+    def ensure_index(self, kind: str, dimension: int, quantization: str = "none") -> None:
+        config = (kind, dimension, quantization)
+        if self._config == config:
+            return
         with self._lock:
-            if self.index and self.index.dimension == dimension and self.index.__class__.__name__ == kind:
+            if self._config == config:
                 return
-            self.embedding_model = LocalEmbeddingModel(dimension=dimension)
             if kind == "HNSWIndex":
-                self.index = HNSWIndex(dimension)
+                index: HNSWIndex | IVFIndex = HNSWIndex(dimension, quantization=quantization)
             elif kind == "IVFIndex":
-                self.index = IVFIndex(dimension)
+                index = IVFIndex(dimension, quantization=quantization)
             else:
                 raise ValueError(f"Unsupported index type: {kind}")
-            LOGGER.debug("Created new index", extra={"type": kind, "dimension": dimension})
+            self.embedding_model = _make_model(dimension)
+            self.index = index
+            self._config = config
+            LOGGER.debug(
+                "Created new index",
+                extra={"type": kind, "dimension": dimension, "quantization": quantization},
+            )
+
+    def embed(self, text: str) -> Vector:
+        return _embed_cached(self.embedding_model.dimension, text)
+
+    @staticmethod
+    def embedding_cache_info() -> Dict[str, Optional[int]]:
+        """Return hit/miss statistics for the shared embedding cache."""
+
+        return _embed_cached.cache_info()._asdict()
 
     def add_vector(self, vector: Vector, metadata: Dict[str, str]) -> None:
         if not self.index:
@@ -53,7 +93,7 @@ class RetrievalState:
 
 
 def _json_response(handler: BaseHTTPRequestHandler, payload: Dict[str, object], status: int = HTTPStatus.OK) -> None:
-    body = json.dumps(payload).encode("utf-8")
+    body = json_dumps(payload)
     handler.send_response(status)
     handler.send_header("Content-Type", "application/json")
     handler.send_header("Content-Length", str(len(body)))
@@ -61,89 +101,119 @@ def _json_response(handler: BaseHTTPRequestHandler, payload: Dict[str, object],
     handler.wfile.write(body)
 
 
-class RetrievalRequestHandler(BaseHTTPRequestHandler):
-    """HTTP handler that routes requests to the retrieval backend."""
+def _dispatch(state: RetrievalState, path: str, raw_body: bytes) -> Tuple[int, Dict[str, object]]:
+    """Route a POST request to ``state`` and return ``(status, body)``."""
 
-    state = RetrievalState()
+    try:
+        payload = json_loads(raw_body or b"{}")
+    except json.JSONDecodeError:  # ``orjson.JSONDecodeError`` subclasses it
+        return HTTPStatus.BAD_REQUEST, {"error": "Invalid JSON"}
 
-    def do_POST(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming convention
-        parsed = urlparse(self.path)
-        content_length = int(self.headers.get("Content-Length", "0"))
-        raw_body = self.rfile.read(content_length) if content_length else b"{}"
+    if path == "/configure":
+        kind = payload.get("index", "HNSWIndex")
+        quantization = str(payload.get("quantization", "none"))
         try:
-            payload = json.loads(raw_body)
-        except json.JSONDecodeError:
-            _json_response(self, {"error": "Invalid JSON"}, status=HTTPStatus.BAD_REQUEST)
-            return
-
-        if parsed.path == "/configure":
-            kind = payload.get("index", "HNSWIndex")
             dimension = int(payload.get("dimension", 256))
-            try:
-                self.state.ensure_index(kind, dimension)
-            except ValueError as exc:  # pragma: no cover - defensive
-                _json_response(self, {"error": str(exc)}, status=HTTPStatus.BAD_REQUEST)
-                return
-            _json_response(self, {"status": "ok"})
-            return
+            state.ensure_index(kind, dimension, quantization)
+        except (TypeError, ValueError) as exc:
+            return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        return HTTPStatus.OK, {"status": "ok"}
+
+    if path == "/documents":
+        metadata = payload.get("metadata", {})
+        text = payload.get("text", "")
+        if not isinstance(metadata, dict) or not isinstance(text, str):
+            return HTTPStatus.BAD_REQUEST, {"error": "Invalid payload"}
+        vector = state.embed(text)
+        try:
+            state.add_vector(vector, {**{k: str(v) for k, v in metadata.items()}, "text": text})
+        except RuntimeError as exc:
+            return HTTPStatus.CONFLICT, {"error": str(exc)}
+        return HTTPStatus.CREATED, {"status": "ok"}
 
-        if parsed.path == "/documents":
-            metadata = payload.get("metadata", {})
-            text = payload.get("text", "")
-            if not isinstance(metadata, dict) or not isinstance(text, str):
-                _json_response(self, {"error": "Invalid payload"}, status=HTTPStatus.BAD_REQUEST)
-                return
-            vector = self.state.embedding_model.embed(text)
-            try:
-                self.state.add_vector(vector, {**{k: str(v) for k, v in metadata.items()}, "text": text})
-            except RuntimeError as exc:
-                _json_response(self, {"error": str(exc)}, status=HTTPStatus.CONFLICT)
-                return
-            _json_response(self, {"status": "ok"}, status=HTTPStatus.CREATED)
-            return
+    if path == "/query":
+        text = payload.get("text", "")
+        k = int(payload.get("k", 5))
+        extra = {}
+        if "n_probe" in payload:
+            extra["n_probe"] = int(payload["n_probe"])
+        vector = state.embed(text)
+        return HTTPStatus.OK, {"results": state.search(vector, k=k, **extra)}
 
-        if parsed.path == "/query":
-            text = payload.get("text", "")
-            k = int(payload.get("k", 5))
-            extra = {}
-            if "n_probe" in payload:
-                extra["n_probe"] = int(payload["n_probe"])
-            vector = self.state.embedding_model.embed(text)
-            results = self.state.search(vector, k=k, **extra)
-            _json_response(self, {"results": results})
-            return
+    return HTTPStatus.NOT_FOUND, {"error": "Unsupported endpoint"}
+
+
+class RetrievalRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler that routes requests to the retrieval backend."""
+
+    state = RetrievalState()
 
-        _json_response(self, {"error": "Unsupported endpoint"}, status=HTTPStatus.NOT_FOUND)
+    def do_POST(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming convention
+        content_length = int(self.headers.get("Content-Length", "0"))
+        raw_body = self.rfile.read(content_length) if content_length else b""
+        status, payload = _dispatch(self.state, urlparse(self.path).path, raw_body)
+        _json_response(self, payload, status=status)
 
     def log_message(self, format: str, *args: object) -> None:  # noqa: A003 - signature defined upstream
         LOGGER.info("HTTP %s - %s", format, args)
 
 
 class LocalRetrievalAPI:
-    """Small helper that manages the HTTP server lifecycle."""
-
-    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+    """Small helper that manages the HTTP server lifecycle.
+
+    ``server="asyncio"`` (the default) serves every connection from one
+    event loop and runs request handling in worker threads, so idle or slow
+    clients do not each hold a thread.  ``server="threading"`` keeps the
+    thread-per-connection ``ThreadingHTTPServer``.  Both serve the state
+    held by :class:`RetrievalRequestHandler`.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, *, server: str = "asyncio") -> None:
+        if server not in ("asyncio", "threading"):
+            raise ValueError(f"Unsupported server type: {server}")
         self.host = host
         self.port = port
-        self._server: Optional[ThreadingHTTPServer] = None
+        self.server = server
+        self._server: ThreadingHTTPServer | AsyncHTTPServer | None = None
         self._thread: Optional[threading.Thread] = None
 
+    @staticmethod
+    async def _handle(method: str, path: str, headers: Dict[str, str], body: bytes) -> Response:
+        if method != "POST":
+            status, payload = HTTPStatus.NOT_IMPLEMENTED, {"error": f"Unsupported method ({method})"}
+        else:
+            # Read the handler's state per request so tests can swap it out.
+            status, payload = await asyncio.to_thread(
+                _dispatch, RetrievalRequestHandler.state, urlparse(path).path, body
+            )
+        return status, {"Content-Type": "application/json"}, json_dumps(payload)
+
     def start(self) -> None:
         if self._server:
             return
-        self._server = ThreadingHTTPServer((self.host, self.port), RetrievalRequestHandler)
-        self.port = self._server.server_address[1]
-        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
-        self._thread.start()
-        LOGGER.debug("Started retrieval API", extra={"host": self.host, "port": self.port})
+        if self.server == "asyncio":
+            async_server = AsyncHTTPServer(self._handle, self.host, self.port, logger=LOGGER)
+            async_server.start()
+            self.port = async_server.port
+            self._server = async_server
+        else:
+            threaded_server = ThreadingHTTPServer((self.host, self.port), RetrievalRequestHandler)
+            self.port = threaded_server.server_address[1]
+            self._thread = threading.Thread(target=threaded_server.serve_forever, daemon=True)
+            self._thread.start()
+            self._server = threaded_server
+        LOGGER.debug("Started retrieval API", extra={"host": self.host, "port": self.port, "server": self.server})
 
     def stop(self) -> None:
         if not self._server:
             return
-        self._server.shutdown()
-        if self._thread:
-            self._thread.join(timeout=1)
-        self._server.server_close()
+        if isinstance(self._server, AsyncHTTPServer):
+            self._server.stop()
+        else:
+            self._server.shutdown()
+            if self._thread:
+                self._thread.join(timeout=1)
+            self._server.server_close()
         self._server = None
         self._thread = None
         LOGGER.debug("Stopped retrieval API")
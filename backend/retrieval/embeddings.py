@@ -4,7 +4,9 @@ from __future__ import annotations
 
 import logging
 import math
+import operator
 from collections import Counter
+import zlib
 from typing import Iterable, List
 
 LOGGER = logging.getLogger(__name__)
@@ -12,12 +14,27 @@ LOGGER = logging.getLogger(__name__)
 Vector = List[float]
 
 
+# The helpers below push their per-component loops into C builtins
+# (``math.hypot``, ``map`` with ``operator`` functions, ``zip``) rather than
+# Python-level generator expressions.
+
+
 def _zero_vector(dimension: int) -> Vector:
-    return [0.0 for _ in range(dimension)]
+    return [0.0] * dimension
 
 
 def _l2_norm(vector: Vector) -> float:
-    return math.sqrt(sum(value * value for value in vector))
+    return math.hypot(*vector)
+
+
+def _bucket_hash(gram: str) -> int:
+    # ``hash()`` on ``str`` is salted per process, which would give every
+    # worker process and every restart different embeddings for the same text.
+    return zlib.crc32(gram.encode("utf-8"))
+
+
+def _dot(vec_a: Vector, vec_b: Vector) -> float:
+    return sum(map(operator.mul, vec_a, vec_b))
 
 
 def _normalise(vector: Vector) -> Vector:
@@ -28,8 +45,7 @@ def _normalise(vector: Vector) -> Vector:
 
 
 def _add_inplace(target: Vector, source: Vector) -> None:
-    for index, value in enumerate(source):
-        target[index] += value
+    target[:] = map(operator.add, target, source)
 
 
 def _scale(vector: Vector, scalar: float) -> Vector:
@@ -41,13 +57,10 @@ def _mean(vectors: Iterable[Vector]) -> Vector:
     if not vectors:
         raise ValueError("Cannot compute mean of empty sequence")
     dimension = len(vectors[0])
-    accumulator = _zero_vector(dimension)
-    for vector in vectors:
-        if len(vector) != dimension:
-            raise ValueError("dimension mismatch in mean computation")
-        _add_inplace(accumulator, vector)
+    if any(len(vector) != dimension for vector in vectors):
+        raise ValueError("dimension mismatch in mean computation")
     count = float(len(vectors))
-    return [value / count for value in accumulator]
+    return [sum(column) / count for column in zip(*vectors)]
 
 
 class LocalEmbeddingModel:
@@ -73,27 +86,46 @@ class LocalEmbeddingModel:
         start, end = self.ngram_range
         grams: Counter[str] = Counter()
         for n in range(start, end + 1):
-            for index in range(len(text) - n + 1):
-                grams[text[index : index + n]] += 1
-        self._logger.debug(
-            "Generated ngrams", extra={"unique": len(grams), "total": sum(grams.values())}
-        )
+            # Zipping ``n`` shifted views of the text yields every window of
+            # length ``n``; the joining and counting both happen in C.
+            grams.update(map("".join, zip(*[text[offset:] for offset in range(n)])))
+        # ``total`` walks every gram, so only compute it when it will be logged.
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug(
+                "Generated ngrams", extra={"unique": len(grams), "total": sum(grams.values())}
+            )
         return grams
 
+    def _vectorise(self, text: str) -> Vector:
+        dimension = self.dimension
+        vector = _zero_vector(dimension)
+        # Counting the grams first and hashing each distinct gram once beats
+        # hashing every occurrence straight into bucket counts: repeated
+        # grams are common in prose, and the Counter merges them in C.
+        for gram, count in self._generate_ngrams(text).items():
+            vector[_bucket_hash(gram) % dimension] += count
+        return _normalise(vector)
+
     def embed(self, text: str) -> Vector:
-        grams = self._generate_ngrams(text)
-        vector = _zero_vector(self.dimension)
-        for gram, count in grams.items():
-            bucket = hash(gram) % self.dimension
-            vector[bucket] += float(count)
-        normalised = _normalise(vector)
-        self._logger.debug(
-            "Created embedding", extra={"dimension": self.dimension, "norm": _l2_norm(normalised)}
-        )
+        normalised = self._vectorise(text)
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug(
+                "Created embedding", extra={"dimension": self.dimension, "norm": _l2_norm(normalised)}
+            )
         return normalised
 
     def embed_many(self, texts: Iterable[str]) -> List[Vector]:
-        return [self.embed(text) for text in texts]
+        """Embed several texts in one call.
+
+        The per-text debug record (and the norm it reports) is replaced by a
+        single summary line for the whole batch.
+        """
+
+        vectors = [self._vectorise(text) for text in texts]
+        self._logger.debug(
+            "Created embeddings", extra={"dimension": self.dimension, "count": len(vectors)}
+        )
+        return vectors
 
 
 def cosine_similarity(vec_a: Vector, vec_b: Vector) -> float:
@@ -103,8 +135,7 @@ def cosine_similarity(vec_a: Vector, vec_b: Vector) -> float:
     norm_b = _l2_norm(vec_b)
     if norm_a == 0.0 or norm_b == 0.0:
         return 0.0
-    dot = sum(a * b for a, b in zip(vec_a, vec_b))
-    return dot / (norm_a * norm_b)
+    return _dot(vec_a, vec_b) / (norm_a * norm_b)
 
 
 __all__ = [
@@ -2,38 +2,103 @@
 
 from __future__ import annotations
 
+from array import array
+import heapq
 import logging
+import math
+import operator
 import random
 from dataclasses import dataclass
 from typing import Dict, List, Sequence, Tuple
 
-from .embeddings import Vector, cosine_similarity
+from .embeddings import Vector, _dot, _l2_norm, _mean, _normalise
 
 LOGGER = logging.getLogger(__name__)
 
 
+QUANTIZATION_MODES = ("none", "int8")
+
+# Sort key for ``(score, metadata)`` results.  ``heapq.nlargest`` selects the
+# top ``k`` in O(n log k) and, like a stable descending sort, keeps ties in
+# candidate order.  Searches clamp ``k`` at zero: a negative ``k`` returns no
+# results rather than relying on how ``nlargest`` treats negative counts.
+_by_score = operator.itemgetter(0)
+
+
 @dataclass
 class IndexedVector:
     vector: Vector
     metadata: Dict[str, str]
 
 
+def _quantize_int8(vector: Vector) -> array:
+    """Scale ``vector`` so its largest component maps to 127 and store it as int8.
+
+    Only the direction matters for cosine similarity, so the per-vector
+    scale factor does not need to be kept alongside the codes.
+    """
+
+    peak = max(map(abs, vector), default=0.0)
+    if peak == 0.0:
+        return array("b", bytes(len(vector)))
+    scale = 127.0 / peak
+    return array("b", [round(value * scale) for value in vector])
+
+
 class VectorIndex:
-    """Base class for vector search indexes."""
+    """Base class for vector search indexes.
+
+    ``quantization="int8"`` stores added vectors as one signed byte per
+    dimension instead of a list of Python floats, trading a little score
+    precision for a large reduction in index memory.
+    """
 
-    def __init__(self, dimension: int, logger: logging.Logger | None = None) -> None:
+    def __init__(
+        self,
+        dimension: int,
+        logger: logging.Logger | None = None,
+        *,
+        quantization: str = "none",
+    ) -> None:
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unsupported quantization: {quantization}")
         self.dimension = dimension
+        self.quantization = quantization
         self._logger = logger or LOGGER
 
+    def _stored(self, item: IndexedVector) -> IndexedVector:
+        """Return ``item`` in the form the index keeps it in memory."""
+
+        if len(item.vector) != self.dimension:
+            raise ValueError("vector dimension mismatch")
+        if self.quantization == "int8":
+            return IndexedVector(vector=_quantize_int8(item.vector), metadata=item.metadata)  # type: ignore[arg-type]
+        return item
+
     def add(self, items: Sequence[IndexedVector]) -> None:
         raise NotImplementedError
 
     def search(self, query: Vector, k: int = 5, **kwargs: object) -> List[Tuple[float, Dict[str, str]]]:
         raise NotImplementedError
 
+    def search_batch(
+        self, queries: Sequence[Vector], k: int = 5, **kwargs: object
+    ) -> List[List[Tuple[float, Dict[str, str]]]]:
+        """Search for several queries at once, returning one result list per query.
+
+        Sub-classes can override this to share work across the batch; the
+        default simply runs :meth:`search` for each query.
+        """
+
+        return [self.search(query, k=k, **kwargs) for query in queries]
+
 
 class HNSWIndex(VectorIndex):
-    """A minimal approximation of an HNSW index."""
+    """A minimal approximation of an HNSW index.
+
+    The norm of every stored vector is kept alongside it, so scoring a
+    candidate costs a single dot product.
+    """
 
     def __init__(
         self,
@@ -42,17 +107,18 @@ class HNSWIndex(VectorIndex):
         ef: int = 32,
         seed: int | None = None,
         logger: logging.Logger | None = None,
+        quantization: str = "none",
     ) -> None:
-        super().__init__(dimension, logger=logger)
+        super().__init__(dimension, logger=logger, quantization=quantization)
         self.ef = max(ef, 1)
         self._rng = random.Random(seed)
         self._items: List[IndexedVector] = []
+        self._norms: List[float] = []
 
     def add(self, items: Sequence[IndexedVector]) -> None:  # type: ignore[override]
-        for item in items:
-            if len(item.vector) != self.dimension:
-                raise ValueError("vector dimension mismatch")
-            self._items.append(item)
+        stored = [self._stored(item) for item in items]
+        self._items.extend(stored)
+        self._norms.extend(_l2_norm(item.vector) for item in stored)
         self._logger.debug("Added vectors to HNSWIndex", extra={"count": len(items)})
 
     def search(self, query: Vector, k: int = 5, **_: object) -> List[Tuple[float, Dict[str, str]]]:  # type: ignore[override]
@@ -60,26 +126,31 @@ class HNSWIndex(VectorIndex):
             raise ValueError("query dimension mismatch")
         if not self._items:
             return []
-        candidates = self._rng.sample(self._items, k=min(len(self._items), self.ef))
-        if len(candidates) < len(self._items):
-            seen = {id(item) for item in candidates}
-            for item in self._items:
-                if id(item) not in seen:
-                    candidates.append(item)
-                    if len(candidates) >= self.ef:
-                        break
+        candidates: Sequence[int]
+        if len(self._items) <= self.ef:
+            # Every item fits in the candidate budget, so score them all.
+            candidates = range(len(self._items))
+        else:
+            candidates = self._rng.sample(range(len(self._items)), k=self.ef)
+        query_norm = _l2_norm(query)
+        items, norms = self._items, self._norms
         scores = [
-            (cosine_similarity(query, item.vector), item.metadata)
-            for item in candidates
+            (_scaled_dot(query, items[position].vector, query_norm * norms[position]), items[position].metadata)
+            for position in candidates
         ]
-        scores.sort(key=lambda pair: pair[0], reverse=True)
-        top_k = scores[:k]
+        top_k = heapq.nlargest(max(k, 0), scores, key=_by_score)
         self._logger.debug("Performed HNSW search", extra={"k": k, "evaluated": len(candidates)})
         return top_k
 
 
 class IVFIndex(VectorIndex):
-    """Simplified IVF (inverted file) index."""
+    """Simplified IVF (inverted file) index.
+
+    Unit-length copies of the centroids are kept next to the centroids
+    themselves, so ranking the lists for a vector is a plain dot product
+    per centroid.  The vector's own norm scales every score equally and is
+    never needed for the ranking.
+    """
 
     def __init__(
         self,
@@ -89,33 +160,64 @@ class IVFIndex(VectorIndex):
         iterations: int = 5,
         seed: int | None = None,
         logger: logging.Logger | None = None,
+        quantization: str = "none",
     ) -> None:
-        super().__init__(dimension, logger=logger)
+        super().__init__(dimension, logger=logger, quantization=quantization)
         if n_lists <= 0:
             raise ValueError("n_lists must be positive")
         self.n_lists = n_lists
         self.iterations = max(iterations, 1)
         self._rng = random.Random(seed)
         self._centroids: List[Vector] = []
+        self._unit_centroids: List[Vector] = []
         self._lists: List[List[IndexedVector]] = []
+        # Norms of the stored vectors, parallel to ``_lists``.
+        self._list_norms: List[List[float]] = []
 
     def _initialise_centroids(self, data: Sequence[Vector]) -> None:
         indices = list(range(len(data)))
         self._rng.shuffle(indices)
         selected = indices[: self.n_lists]
         self._centroids = [list(data[idx]) for idx in selected]
-        self._lists = [[] for _ in range(len(self._centroids))]
         if len(self._centroids) < self.n_lists:
             for _ in range(self.n_lists - len(self._centroids)):
                 noise = [self._rng.uniform(-1.0, 1.0) for _ in range(self.dimension)]
                 self._centroids.append(noise)
-                self._lists.append([])
+        self._refresh_unit_centroids()
+        self._reset_lists()
+
+    def _refresh_unit_centroids(self) -> None:
+        # Only the centroids' directions rank lists; the raw centroids stay
+        # untouched because IVF-PQ encodes residuals against them.
+        self._unit_centroids = [_normalise(centroid) for centroid in self._centroids]
+
+    def _reset_lists(self) -> None:
+        self._lists = [[] for _ in self._centroids]
+        self._list_norms = [[] for _ in self._centroids]
+
+    def _centroid_scores(self, vector: Vector) -> List[float]:
+        return [_dot(vector, centroid) for centroid in self._unit_centroids]
+
+    def _probe(self, query: Vector, n_probe: int) -> List[int]:
+        """Return the ``n_probe`` lists whose centroids are closest to ``query``."""
+
+        scores = self._centroid_scores(query)
+        return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:n_probe]
 
     def _assign(self, vector: Vector) -> int:
+        return self._assign_many([vector])[0]
+
+    def _assign_many(self, vectors: Sequence[Vector]) -> List[int]:
+        """Return the bucket of the closest centroid for every vector."""
+
         if not self._centroids:
             raise RuntimeError("Index has not been trained")
-        scores = [cosine_similarity(vector, centroid) for centroid in self._centroids]
-        return max(range(len(scores)), key=lambda idx: scores[idx])
+        positions = range(len(self._unit_centroids))
+        assignments: List[int] = []
+        for vector in vectors:
+            scores = self._centroid_scores(vector)
+            assignments.append(max(positions, key=scores.__getitem__))
+        return assignments
 
     def fit(self, data: Sequence[Vector]) -> None:
         if len(data) < self.n_lists:
@@ -126,29 +228,22 @@ class IVFIndex(VectorIndex):
         self._initialise_centroids(data)
         for _ in range(self.iterations):
             assignments: List[List[Vector]] = [[] for _ in range(len(self._centroids))]
-            for vector in data:
-                assignments[self._assign(vector)].append(vector)
+            for vector, idx in zip(data, self._assign_many(data)):
+                assignments[idx].append(vector)
             for idx, assigned in enumerate(assignments):
-                if not assigned:
-                    continue
-                centroid = [0.0 for _ in range(self.dimension)]
-                for vector in assigned:
-                    for dim, value in enumerate(vector):
-                        centroid[dim] += value
-                count = float(len(assigned))
-                centroid = [value / count for value in centroid]
-                self._centroids[idx] = centroid
-        self._lists = [[] for _ in range(len(self._centroids))]
+                if assigned:
+                    self._centroids[idx] = _mean(assigned)
+            self._refresh_unit_centroids()
+        self._reset_lists()
         self._logger.debug("Trained IVF index", extra={"lists": len(self._lists)})
 
     def add(self, items: Sequence[IndexedVector]) -> None:  # type: ignore[override]
         if not self._centroids:
             raise RuntimeError("Index must be fit before adding items")
-        for item in items:
-            if len(item.vector) != self.dimension:
-                raise ValueError("vector dimension mismatch")
-            bucket = self._assign(item.vector)
-            self._lists[bucket].append(item)
+        stored = [self._stored(item) for item in items]
+        for item, idx in zip(stored, self._assign_many([item.vector for item in items])):
+            self._lists[idx].append(item)
+            self._list_norms[idx].append(_l2_norm(item.vector))
         self._logger.debug("Added vectors to IVFIndex", extra={"count": len(items)})
 
     def search(self, query: Vector, k: int = 5, n_probe: int | None = None, **_: object) -> List[Tuple[float, Dict[str, str]]]:  # type: ignore[override]
@@ -157,27 +252,209 @@ class IVFIndex(VectorIndex):
         if not self._centroids:
             return []
         n_probe = n_probe or min(2, len(self._centroids))
-        scores = [cosine_similarity(query, centroid) for centroid in self._centroids]
-        ranked = sorted(range(len(scores)), key=lambda idx: scores[idx], reverse=True)[:n_probe]
-        candidates: List[IndexedVector] = []
+        ranked = self._probe(query, n_probe)
+        query_norm = _l2_norm(query)
+        results: List[Tuple[float, Dict[str, str]]] = []
         for idx in ranked:
-            candidates.extend(self._lists[idx])
+            results.extend(
+                (_scaled_dot(query, item.vector, query_norm * item_norm), item.metadata)
+                for item, item_norm in zip(self._lists[idx], self._list_norms[idx])
+            )
+        top_k = heapq.nlargest(max(k, 0), results, key=_by_score)
+        self._logger.debug(
+            "Performed IVF search",
+            extra={"k": k, "n_probe": n_probe, "candidates": len(results)},
+        )
+        return top_k
+
+    def search_batch(  # type: ignore[override]
+        self,
+        queries: Sequence[Vector],
+        k: int = 5,
+        n_probe: int | None = None,
+        **_: object,
+    ) -> List[List[Tuple[float, Dict[str, str]]]]:
+        """Search several queries, scanning each probed list once per batch.
+
+        Query norms are computed once rather than per comparison, and
+        every probed list is scanned once no matter how many queries in the
+        batch probe it.  Each query's candidates are then gathered in its
+        own probe order, so results (including ties) match :meth:`search`.
+        """
+
+        for query in queries:
+            if len(query) != self.dimension:
+                raise ValueError("query dimension mismatch")
+        if not self._centroids:
+            return [[] for _ in queries]
+        n_probe = n_probe or min(2, len(self._centroids))
+        query_norms = [_l2_norm(query) for query in queries]
+        probes = [self._probe(query, n_probe) for query in queries]
+        probing: Dict[int, List[int]] = {}
+        for position, ranked in enumerate(probes):
+            for idx in ranked:
+                probing.setdefault(idx, []).append(position)
+        scored: Dict[Tuple[int, int], List[Tuple[float, Dict[str, str]]]] = {}
+        for idx, positions in probing.items():
+            per_query = [scored.setdefault((idx, position), []) for position in positions]
+            for item, item_norm in zip(self._lists[idx], self._list_norms[idx]):
+                for position, candidates in zip(positions, per_query):
+                    score = _scaled_dot(queries[position], item.vector, query_norms[position] * item_norm)
+                    candidates.append((score, item.metadata))
         results = [
-            (cosine_similarity(query, item.vector), item.metadata)
-            for item in candidates
+            heapq.nlargest(
+                max(k, 0),
+                (candidate for idx in ranked for candidate in scored[(idx, position)]),
+                key=_by_score,
+            )
+            for position, ranked in enumerate(probes)
         ]
-        results.sort(key=lambda pair: pair[0], reverse=True)
-        top_k = results[:k]
         self._logger.debug(
-            "Performed IVF search",
-            extra={"k": k, "n_probe": n_probe, "candidates": len(candidates)},
+            "Performed batched IVF search",
+            extra={"k": k, "n_probe": n_probe, "queries": len(queries), "lists": len(probing)},
+        )
+        return results
+
+
+class IVFPQIndex(IVFIndex):
+    """IVF index that stores product-quantized residuals instead of raw vectors.
+
+    After the coarse IVF centroids are trained, each vector's residual
+    (vector minus its list centroid) is split into ``m_subquantizers``
+    equal slices and every slice is replaced by the id of its nearest
+    codeword, so a stored vector costs ``m_subquantizers`` bytes.  Searches
+    build a per-list lookup table of squared distances between the query
+    residual and every codeword, then score a stored vector with one table
+    lookup per slice.  Scores are reported as approximate cosine
+    similarities, which is exact up to quantization error for the unit
+    vectors produced by :class:`~backend.retrieval.embeddings.LocalEmbeddingModel`.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        *,
+        n_lists: int = 4,
+        m_subquantizers: int = 16,
+        n_bits: int = 8,
+        iterations: int = 5,
+        seed: int | None = None,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        super().__init__(dimension, n_lists=n_lists, iterations=iterations, seed=seed, logger=logger)
+        if m_subquantizers <= 0 or dimension % m_subquantizers:
+            raise ValueError("dimension must be divisible by m_subquantizers")
+        if not 1 <= n_bits <= 8:
+            raise ValueError("n_bits must be between 1 and 8")
+        self.m_subquantizers = m_subquantizers
+        self.n_bits = n_bits
+        self._sub_dimension = dimension // m_subquantizers
+        self._codebooks: List[List[Vector]] = []
+        self._codes: List[List[Tuple[bytes, Dict[str, str]]]] = []
+
+    def _slices(self, vector: Vector) -> List[Vector]:
+        width = self._sub_dimension
+        return [list(vector[start : start + width]) for start in range(0, self.dimension, width)]
+
+    def _residual(self, vector: Vector, bucket: int) -> Vector:
+        return list(map(operator.sub, vector, self._centroids[bucket]))
+
+    @staticmethod
+    def _nearest(point: Vector, codewords: Sequence[Vector]) -> int:
+        distances = [math.dist(point, codeword) for codeword in codewords]
+        return min(range(len(distances)), key=distances.__getitem__)
+
+    def _train_codebook(self, points: List[Vector]) -> List[Vector]:
+        size = min(2 ** self.n_bits, len(points))
+        codebook = [list(points[idx]) for idx in self._rng.sample(range(len(points)), size)]
+        for _ in range(self.iterations):
+            sums = [[0.0] * self._sub_dimension for _ in codebook]
+            counts = [0] * len(codebook)
+            for point in points:
+                nearest = self._nearest(point, codebook)
+                counts[nearest] += 1
+                sums[nearest][:] = map(operator.add, sums[nearest], point)
+            for idx, count in enumerate(counts):
+                if count:
+                    codebook[idx] = [value / count for value in sums[idx]]
+        return codebook
+
+    def _encode(self, residual: Vector) -> bytes:
+        return bytes(
+            self._nearest(piece, codebook)
+            for piece, codebook in zip(self._slices(residual), self._codebooks)
+        )
+
+    def fit(self, data: Sequence[Vector]) -> None:  # type: ignore[override]
+        super().fit(data)
+        residual_slices = [
+            self._slices(self._residual(vector, bucket))
+            for vector, bucket in zip(data, self._assign_many(data))
+        ]
+        self._codebooks = [
+            self._train_codebook([slices[part] for slices in residual_slices])
+            for part in range(self.m_subquantizers)
+        ]
+        self._codes = [[] for _ in range(len(self._centroids))]
+        self._logger.debug(
+            "Trained IVF-PQ codebooks",
+            extra={"subquantizers": self.m_subquantizers, "codewords": len(self._codebooks[0])},
+        )
+
+    def add(self, items: Sequence[IndexedVector]) -> None:  # type: ignore[override]
+        if not self._codebooks:
+            raise RuntimeError("Index must be fit before adding items")
+        for item in items:
+            if len(item.vector) != self.dimension:
+                raise ValueError("vector dimension mismatch")
+        for item, bucket in zip(items, self._assign_many([item.vector for item in items])):
+            self._codes[bucket].append((self._encode(self._residual(item.vector, bucket)), item.metadata))
+        self._logger.debug("Added vectors to IVFPQIndex", extra={"count": len(items)})
+
+    def search(self, query: Vector, k: int = 5, n_probe: int | None = None, **_: object) -> List[Tuple[float, Dict[str, str]]]:  # type: ignore[override]
+        if len(query) != self.dimension:
+            raise ValueError("query dimension mismatch")
+        if not self._codebooks:
+            return []
+        norm = _l2_norm(query)
+        if norm:
+            query = [value / norm for value in query]
+        n_probe = n_probe or min(2, len(self._centroids))
+        results: List[Tuple[float, Dict[str, str]]] = []
+        for bucket in self._probe(query, n_probe):
+            if not self._codes[bucket]:
+                continue
+            table = [
+                [math.dist(piece, codeword) ** 2 for codeword in codebook]
+                for piece, codebook in zip(self._slices(self._residual(query, bucket)), self._codebooks)
+            ]
+            for codes, metadata in self._codes[bucket]:
+                distance = sum(map(list.__getitem__, table, codes))
+                # ||q - x||^2 = 2 - 2 cos(q, x) for unit vectors.
+                results.append((1.0 - distance / 2.0, metadata))
+        top_k = heapq.nlargest(max(k, 0), results, key=_by_score)
+        self._logger.debug(
+            "Performed IVF-PQ search",
+            extra={"k": k, "n_probe": n_probe, "candidates": len(results)},
         )
         return top_k
 
+    # The batched IVF scan reads raw vectors; PQ lists only hold codes.
+    search_batch = VectorIndex.search_batch
+
+
+def _scaled_dot(vec_a: Vector, vec_b: Vector, norm_product: float) -> float:
+    # Cosine similarity with the norms supplied by the caller.
+    if norm_product == 0.0:
+        return 0.0
+    return _dot(vec_a, vec_b) / norm_product
+
 
 __all__ = [
+    "QUANTIZATION_MODES",
     "IndexedVector",
     "VectorIndex",
     "HNSWIndex",
     "IVFIndex",
+    "IVFPQIndex",
 ]
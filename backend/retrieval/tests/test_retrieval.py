@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 import json
+import os
+from pathlib import Path
+import subprocess
+import sys
 import time
 import urllib.request
 
 import math
 import pytest
 
-from backend.retrieval.api import LocalRetrievalAPI, RetrievalRequestHandler
+from backend.retrieval.api import LocalRetrievalAPI, RetrievalRequestHandler, RetrievalState, _dispatch
 from backend.retrieval.embeddings import LocalEmbeddingModel
-from backend.retrieval.index import HNSWIndex, IVFIndex, IndexedVector
+from backend.retrieval.index import HNSWIndex, IVFIndex, IVFPQIndex, IndexedVector, VectorIndex
 
 
 @pytest.fixture(autouse=True)
@@ -25,45 +29,157 @@ def test_embedding_model_produces_normalised_vectors() -> None:
     assert math.isclose(norm, 1.0, rel_tol=1e-6)
 
 
-def test_hnsw_index_returns_expected_document() -> None:
-    model = LocalEmbeddingModel(dimension=32)
-    index = HNSWIndex(dimension=32, ef=10, seed=123)
-    documents = [
-        "the quick brown fox",
-        "lorem ipsum dolor",
-        "retrieval augmented generation",
-    ]
+def test_embeddings_are_identical_across_processes() -> None:
+    script = (
+        "import json; from backend.retrieval.embeddings import LocalEmbeddingModel; "
+        "print(json.dumps(LocalEmbeddingModel(dimension=32).embed('stable across processes')))"
+    )
+    root = str(Path(__file__).resolve().parents[3])
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", script],
+            env={**os.environ, "PYTHONPATH": root, "PYTHONHASHSEED": seed},
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        for seed in ("1", "2")
+    }
+    assert len(outputs) == 1
+
+
+def _build_index(index: VectorIndex, documents: list[str]) -> LocalEmbeddingModel:
+    model = LocalEmbeddingModel(dimension=index.dimension)
     vectors = model.embed_many(documents)
+    if isinstance(index, IVFIndex):
+        index.fit(vectors)
     index.add(
         [
             IndexedVector(vector=vector, metadata={"text": text})
             for vector, text in zip(vectors, documents)
         ]
     )
+    return model
+
+
+def test_hnsw_index_returns_expected_document() -> None:
+    index = HNSWIndex(dimension=32, ef=10, seed=123)
+    documents = [
+        "the quick brown fox",
+        "lorem ipsum dolor",
+        "retrieval augmented generation",
+    ]
+    model = _build_index(index, documents)
     query = model.embed("quick brown animal")
     results = index.search(query, k=1)
     assert results[0][1]["text"] == "the quick brown fox"
 
 
+def test_int8_quantized_index_preserves_ranking() -> None:
+    documents = ["the quick brown fox", "lorem ipsum dolor", "retrieval augmented generation"]
+    index = HNSWIndex(dimension=32, ef=10, seed=123, quantization="int8")
+    model = _build_index(index, documents)
+    results = index.search(model.embed("quick brown animal"), k=1)
+    assert results[0][1]["text"] == "the quick brown fox"
+    with pytest.raises(ValueError):
+        HNSWIndex(dimension=32, quantization="int4")
+
+
 def test_ivf_index_end_to_end() -> None:
-    model = LocalEmbeddingModel(dimension=32)
     documents = [f"document {i}" for i in range(10)]
-    vectors = model.embed_many(documents)
     index = IVFIndex(dimension=32, n_lists=3, iterations=2, seed=42)
-    index.fit(vectors)
+    model = _build_index(index, documents)
+    query = model.embed("document 1")
+    results = index.search(query, k=3, n_probe=2)
+    assert any(result[1]["text"] == "document 1" for result in results)
+
+
+def test_ivfpq_index_recovers_indexed_documents() -> None:
+    documents = [f"document {i} about topic {i % 3}" for i in range(12)]
+    index = IVFPQIndex(dimension=32, n_lists=2, m_subquantizers=4, n_bits=4, iterations=3, seed=3)
+    model = _build_index(index, documents)
+    results = index.search(model.embed("document 4 about topic 1"), k=3, n_probe=2)
+    assert any(result[1]["text"] == "document 4 about topic 1" for result in results)
+    with pytest.raises(ValueError):
+        IVFPQIndex(dimension=30, m_subquantizers=4)
+
+
+def test_ivf_search_batch_matches_single_queries() -> None:
+    documents = [f"document {i} about topic {i % 3}" for i in range(12)]
+    index = IVFIndex(dimension=32, n_lists=3, iterations=2, seed=7)
+    model = _build_index(index, documents)
+    queries = model.embed_many(["topic 0", "document 5", "topic 2"])
+    batched = index.search_batch(queries, k=3, n_probe=2)
+    single = [index.search(query, k=3, n_probe=2) for query in queries]
+    assert [[meta["text"] for _, meta in res] for res in batched] == [
+        [meta["text"] for _, meta in res] for res in single
+    ]
+
+
+def test_ivf_search_batch_breaks_ties_like_search() -> None:
+    index = IVFIndex(dimension=4, n_lists=2, iterations=1, seed=0)
+    index.fit([[1.0, 0.0, 1.0, 0.0], [0.0, 1.0, 0.0, 1.0]])
     index.add(
         [
-            IndexedVector(vector=vector, metadata={"text": text})
-            for vector, text in zip(vectors, documents)
+            IndexedVector(vector=[1.0, 0.0, 0.0, 0.0], metadata={"text": "a"}),
+            IndexedVector(vector=[0.0, 1.0, 0.0, 0.0], metadata={"text": "b"}),
         ]
     )
-    query = model.embed("document 1")
-    results = index.search(query, k=3, n_probe=2)
-    assert any(result[1]["text"] == "document 1" for result in results)
+    # Both queries score both items 0.0 but probe the two lists in opposite orders.
+    queries = [[0.0, 0.0, 1.0, 0.5], [0.0, 0.0, 0.5, 1.0]]
+    single = [index.search(query, k=1, n_probe=2) for query in queries]
+    assert [res[0][1]["text"] for res in single] == ["a", "b"]
+    assert index.search_batch(queries, k=1, n_probe=2) == single
+
+
+def test_negative_k_returns_no_results() -> None:
+    documents = ["alpha", "beta", "gamma", "delta"]
+    hnsw = HNSWIndex(dimension=16)
+    ivf = IVFIndex(dimension=16, n_lists=2, iterations=1, seed=1)
+    model = _build_index(hnsw, documents)
+    _build_index(ivf, documents)
+    queries = model.embed_many(["alpha", "beta"])
+    assert hnsw.search(queries[0], k=-1) == []
+    assert ivf.search(queries[0], k=-1) == []
+    assert ivf.search_batch(queries, k=-1) == [[], []]
+
+
+def test_retrieval_state_reuses_embeddings_for_repeated_text() -> None:
+    state = RetrievalState()
+    state.ensure_index("HNSWIndex", 48)
+    hits = state.embedding_cache_info()["hits"]
+    first = state.embed("repeated query text")
+    second = state.embed("repeated query text")
+    assert first == LocalEmbeddingModel(dimension=48).embed("repeated query text")
+    assert second is first
+    assert state.embedding_cache_info()["hits"] == hits + 1
+
+
+def test_retrieval_state_configures_quantized_index() -> None:
+    state = RetrievalState()
+    state.ensure_index("IVFIndex", 32, "int8")
+    assert isinstance(state.index, IVFIndex)
+    assert state.index.quantization == "int8"
+    with pytest.raises(ValueError):
+        state.ensure_index("HNSWIndex", 32, "int4")
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"index": "HNSWIndex", "dimension": 32, "quantization": "bogus"},
+        {"index": "HNSWIndex", "dimension": "wide"},
+    ],
+)
+def test_configure_rejects_invalid_settings(payload: dict) -> None:
+    status, body = _dispatch(RetrievalState(), "/configure", json.dumps(payload).encode("utf-8"))
+    assert status == 400
+    assert body["error"]
 
 
-def test_retrieval_api_round_trip() -> None:
-    api = LocalRetrievalAPI()
+@pytest.mark.parametrize("server", ["asyncio", "threading"])
+def test_retrieval_api_round_trip(server: str) -> None:
+    api = LocalRetrievalAPI(server=server)
     api.start()
     try:
         base_url = f"http://{api.host}:{api.port}"